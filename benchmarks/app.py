@@ -0,0 +1,35 @@
+"""
+Streamlit app rendering one generated table for the browser benchmarks.
+
+Query parameters: ``rows`` (default 10000), ``mode`` ("client", "worker"
+or "server") and ``transport`` (default "columnar").
+"""
+
+import streamlit as st
+
+from st_datatables import st_datatables
+from datasets import make_frame
+
+
+@st.cache_data
+def _frame(rows):
+    return make_frame(rows, 8, "mixed")
+
+
+params = st.query_params
+rows = int(params.get("rows", 10_000))
+mode = params.get("mode", "client")
+df = _frame(rows)
+cols = list(df.columns)
+
+st_datatables(
+    df,
+    id_col="ID",
+    pageLength=50,
+    orderable_cols=cols,
+    searchable_cols=cols,
+    transport=params.get("transport", "columnar"),
+    worker=mode == "worker",
+    serverSide=mode == "server",
+    key=f"bench-{mode}-{rows}",
+)
@@ -0,0 +1,96 @@
+"""
+Browser timings of generated tables, driven by Playwright against
+benchmarks/app.py: time to the first drawn row, then the latency of a
+sort, a search and a page change, from the user action to the redraw of
+the table body.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from e2e_utils import StreamlitRunner
+from playwright.sync_api import Page
+
+APP_FILE = Path(__file__).with_name("app.py")
+IFRAME = 'iframe[title="st_datatables.st_datatables"]'
+FIRST_ROW = "table.dataTable tbody tr td:not(.dt-empty)"
+TIMEOUT_MS = 120_000
+
+# Runs `action` in the component iframe and resolves with the milliseconds
+# until the table body next changes.
+_TIME_ACTION = """
+async ([action, arg]) => {
+  const body = document.querySelector("table.dataTable tbody")
+  const changed = new Promise((resolve, reject) => {
+    const observer = new MutationObserver(() => {
+      observer.disconnect()
+      resolve(performance.now())
+    })
+    observer.observe(body, { childList: true, subtree: true, characterData: true })
+    setTimeout(() => reject(new Error(`no redraw after ${action}`)), %d)
+  })
+  const start = performance.now()
+  if (action === "sort") {
+    const headers = Array.from(document.querySelectorAll("thead th"))
+    headers.find((th) => th.textContent.trim().startsWith(arg)).click()
+  } else if (action === "search") {
+    const input = document.querySelector(".dt-search input")
+    input.value = arg
+    input.dispatchEvent(new Event("input", { bubbles: true }))
+  } else {
+    document.querySelector(".dt-paging-button.next").click()
+  }
+  return (await changed) - start
+}
+""" % TIMEOUT_MS
+
+MODES = ["client", "worker", "server"]
+ACTIONS = {
+    "sort": ["float_1", "float_1", "word_2"],
+    "search": ["echo", "tango 4", "kilo"],
+    "page": [None, None, None],
+}
+
+
+@pytest.fixture(scope="module")
+def streamlit_app():
+    with StreamlitRunner(APP_FILE) as runner:
+        yield runner
+
+
+def _open(page: Page, url):
+    """Load the app and return the component frame once a row is drawn."""
+    page.goto(url)
+    frame = page.wait_for_selector(IFRAME, timeout=TIMEOUT_MS).content_frame()
+    frame.wait_for_selector(FIRST_ROW, timeout=TIMEOUT_MS)
+    return frame
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_first_row(page: Page, streamlit_app, benchmark, rows, mode):
+    url = f"{streamlit_app.server_url}/?rows={rows}&mode={mode}"
+    # The first load also generates the table; only later ones are timed.
+    _open(page, url)
+    timings = []
+    for _ in range(benchmark.repeat):
+        start = time.perf_counter()
+        _open(page, url)
+        timings.append(time.perf_counter() - start)
+    benchmark.record(timings)
+
+
+@pytest.mark.parametrize("action", list(ACTIONS))
+@pytest.mark.parametrize("mode", MODES)
+def test_interaction(page: Page, streamlit_app, benchmark, rows, mode, action):
+    frame = _open(page, f"{streamlit_app.server_url}/?rows={rows}&mode={mode}")
+    timings = []
+    args = ACTIONS[action]
+    for i in range(benchmark.repeat):
+        timings.append(frame.evaluate(_TIME_ACTION, [action, args[i % len(args)]]) / 1000)
+        # Let the previous draw settle before the next action.
+        page.wait_for_timeout(500)
+    benchmark.record(timings)
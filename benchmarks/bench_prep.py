@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks of the data preparation done by `st_datatables()`:
+serializing, encoding and compressing the DataFrame into component args,
+without a browser. The component itself is replaced by a function
+returning nothing, and the shared payload cache is off (its default) so
+every run serializes again.
+"""
+
+import pytest
+
+import st_datatables
+from st_datatables._filters import ColumnFilters
+from st_datatables._serverside import process_request
+from datasets import make_frame
+
+_frames = {}
+
+
+def _frame(rows, cols, profile):
+    key = (rows, cols, profile)
+    if key not in _frames:
+        _frames.clear()
+        _frames[key] = make_frame(rows, cols, profile)
+    return _frames[key]
+
+
+@pytest.fixture(autouse=True)
+def no_component(monkeypatch):
+    monkeypatch.setattr(st_datatables, "_component_func", lambda **kwargs: None)
+
+
+@pytest.mark.parametrize("transport", ["records", "columnar", "arrow"])
+@pytest.mark.parametrize("profile", ["numeric", "text", "mixed"])
+@pytest.mark.parametrize("cols", [8, 32], ids=["8cols", "32cols"])
+def test_prepare(benchmark, rows, cols, profile, transport):
+    df = _frame(rows, cols, profile)
+    benchmark(lambda: st_datatables.st_datatables(df, transport=transport))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"transport": "columnar", "compression": "deflate"},
+        {"transport": "columnar", "categorical_cols": "auto"},
+        {"transport": "columnar", "presort": True},
+        {"transport": "columnar", "shared_cache": True},
+    ],
+    ids=["deflate", "categorical", "presort", "shared-hit"],
+)
+def test_prepare_options(benchmark, rows, options):
+    df = _frame(rows, 8, "mixed")
+    options = dict(options)
+    if options.get("presort"):
+        options["orderable_cols"] = list(df.columns)
+    benchmark(lambda: st_datatables.st_datatables(df, **options))
+
+
+@pytest.mark.parametrize("filtered", [False, True], ids=["search", "search-filters"])
+def test_server_page(benchmark, rows, filtered):
+    """One server-side page of a searched, filtered and ordered DataFrame."""
+    df = _frame(rows, 8, "mixed")
+    request = {
+        "draw": 1,
+        "start": 100,
+        "length": 50,
+        "search": "echo",
+        "order": [{"column": "float_1", "dir": "desc"}],
+        "filters": [{"column": "int_0", "min": 1000, "max": 900_000}] if filtered else [],
+    }
+    cols = list(df.columns)
+    # A fresh mask cache each run: nothing is answered from a previous one.
+    benchmark(
+        lambda: process_request(df, request, cols, cols, filter_cols=cols, filters=ColumnFilters())
+    )
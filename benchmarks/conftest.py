@@ -0,0 +1,139 @@
+"""
+Timing fixtures shared by the benchmarks.
+
+Every benchmark records its median time under its test id. A time more
+than ``--bench-tolerance`` times its stored baseline (and at least
+`MIN_REGRESSION_S` slower) fails the test; ``--update-baselines`` writes
+the measured times to baselines.json instead.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT_DIRECTORY = Path(__file__).parent.parent.absolute()
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+# Let the browser benchmarks share the e2e Streamlit runner.
+sys.path.insert(0, str(ROOT_DIRECTORY / "e2e"))
+sys.path.insert(0, str(ROOT_DIRECTORY))
+
+# Slowdowns smaller than this are noise for the shortest benchmarks.
+MIN_REGRESSION_S = 0.005
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--bench-rows",
+        default="10000,100000,1000000",
+        help="Comma separated row counts of the generated tables.",
+    )
+    group.addoption(
+        "--bench-repeat",
+        type=int,
+        default=3,
+        help="Timed runs per benchmark; the median is kept.",
+    )
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=1.5,
+        help="Fail when a median exceeds its baseline by this factor.",
+    )
+    group.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="Store the measured medians as the new baselines.",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "rows" in metafunc.fixturenames:
+        rows = [int(r) for r in metafunc.config.getoption("--bench-rows").split(",")]
+        metafunc.parametrize("rows", rows, ids=[f"{r}rows" for r in rows])
+
+
+def _load_baselines():
+    if not BASELINES_FILE.exists():
+        return {}
+    return json.loads(BASELINES_FILE.read_text()).get("results", {})
+
+
+class Benchmark:
+    """Times one benchmark and checks it against its baseline."""
+
+    def __init__(self, name, config, baselines):
+        self.name = name
+        self.repeat = config.getoption("--bench-repeat")
+        self.tolerance = config.getoption("--bench-tolerance")
+        self.update = config.getoption("--update-baselines")
+        self.baseline = baselines.get(name)
+
+    def __call__(self, func, warmup=1):
+        """Run `func` `warmup` times untimed, then time it; return the median."""
+        for _ in range(warmup):
+            func()
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return self.record(timings)
+
+    def record(self, timings):
+        """Record timings measured elsewhere (seconds); return their median."""
+        median = statistics.median(timings)
+        _results[self.name] = (median, self.baseline)
+        if self.update or self.baseline is None:
+            return median
+        limit = max(self.baseline * self.tolerance, self.baseline + MIN_REGRESSION_S)
+        if median > limit:
+            pytest.fail(
+                f"{self.name}: {median * 1000:.1f} ms, baseline "
+                f"{self.baseline * 1000:.1f} ms (tolerance x{self.tolerance})"
+            )
+        return median
+
+
+@pytest.fixture(scope="session")
+def _baselines():
+    return _load_baselines()
+
+
+@pytest.fixture
+def benchmark(request, _baselines):
+    return Benchmark(request.node.name, request.config, _baselines)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    for name, (median, baseline) in sorted(_results.items()):
+        ratio = f"x{median / baseline:.2f}" if baseline else "no baseline"
+        terminalreporter.write_line(f"{median * 1000:10.1f} ms  {ratio:>12}  {name}")
+    if config.getoption("--update-baselines"):
+        results = _load_baselines()
+        results.update({name: round(median, 6) for name, (median, _) in _results.items()})
+        BASELINES_FILE.write_text(
+            json.dumps(
+                {
+                    "machine": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "processor": platform.processor() or platform.machine(),
+                    },
+                    "results": dict(sorted(results.items())),
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        terminalreporter.write_line(f"Baselines written to {BASELINES_FILE}")
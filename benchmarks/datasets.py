@@ -0,0 +1,64 @@
+"""Generated tables for the benchmarks."""
+
+import numpy as np
+import pandas as pd
+
+# Column kinds cycled through by each dtype profile.
+PROFILES = {
+    "numeric": ("int", "float"),
+    "text": ("word", "sentence"),
+    "mixed": ("int", "float", "word", "sentence", "datetime", "category", "bool"),
+}
+_WORDS = np.array(
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor".split()
+)
+
+
+def _column(kind, rows, rng):
+    if kind == "int":
+        return rng.integers(0, 1_000_000, rows)
+    if kind == "float":
+        values = rng.normal(size=rows) * 1000
+        values[rng.random(rows) < 0.01] = np.nan
+        return values
+    if kind == "word":
+        return _WORDS[rng.integers(0, len(_WORDS), rows)].astype(object)
+    if kind == "sentence":
+        # Mostly distinct strings, like names or descriptions.
+        first = _WORDS[rng.integers(0, len(_WORDS), rows)]
+        second = _WORDS[rng.integers(0, len(_WORDS), rows)]
+        numbers = rng.integers(0, 100_000, rows).astype(str)
+        return pd.Series(first).str.cat([second, numbers], sep=" ").to_numpy(dtype=object)
+    if kind == "datetime":
+        seconds = rng.integers(0, 5 * 365 * 86_400, rows)
+        return pd.Timestamp("2020-01-01") + pd.to_timedelta(seconds, unit="s")
+    if kind == "category":
+        return pd.Categorical(_WORDS[rng.integers(0, 8, rows)])
+    if kind == "bool":
+        return rng.random(rows) < 0.5
+    raise ValueError(f"Unknown column kind: {kind!r}")
+
+
+def make_frame(rows, cols=8, profile="mixed", seed=0):
+    """
+    A DataFrame with a unique "ID" column and `cols` generated columns.
+
+    Parameters
+    ----------
+    rows : int
+    cols : int, default 8
+    profile : {"numeric", "text", "mixed"}, default "mixed"
+        Column kinds, cycled through in order; see `PROFILES`.
+    seed : int, default 0
+        The same arguments always generate the same table.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile!r}")
+    rng = np.random.default_rng(seed)
+    kinds = PROFILES[profile]
+    data = {"ID": np.arange(rows)}
+    for j in range(cols):
+        kind = kinds[j % len(kinds)]
+        data[f"{kind}_{j}"] = _column(kind, rows, rng)
+    return pd.DataFrame(data)
@@ -1,8 +1,37 @@
 import os
+import time
 
+import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 
+from ._cache import LRUCache, frame_fingerprint, shared_payloads
+from ._delta import compute_delta, row_hashes
+from ._encoding import (
+    as_categories,
+    categorical_columns,
+    column_kinds,
+    deflate_payload,
+    dictionaries,
+    encode_columnar,
+    pack_payload,
+    to_records,
+)
+from ._filters import ColumnFilters, filter_specs
+from ._lazy import column_values, lazy_values
+from ._presort import sort_ranks
+from ._search_index import SearchIndex
+from ._serverside import default_request, pending_request, process_request
+from .assets import AssetColumn, with_assets
+from .sources import (
+    ArrowSource,
+    DuckDBSource,
+    PolarsSource,
+    SQLiteSource,
+    TableSource,
+    as_source,
+)
+
 _RELEASE = True
 
 if not _RELEASE:
@@ -15,6 +44,165 @@ else:
     build_dir = os.path.join(parent_dir, "frontend/build")
     _component_func = components.declare_component("st_datatables", path=build_dir)
 
+_TRANSPORTS = ("records", "arrow", "columnar")
+_COMPRESSIONS = (None, "deflate")
+_RETURN_MODES = {
+    "rows": {'rows': [], 'indexes': [], 'count': 0},
+    "ids": {'ids': [], 'indexes': [], 'count': 0},
+    "indexes": {'indexes': [], 'count': 0},
+}
+_SESSION_CACHE_KEY = "_st_datatables_cache"
+
+
+def _internal_state(value):
+    """Return the frontend's internal `_dt` channel from a component value."""
+    if isinstance(value, dict) and isinstance(value.get("_dt"), dict):
+        return value["_dt"]
+    return {}
+
+
+def _session_cache():
+    """Per-session LRU of serialized payloads, keyed by widget key."""
+    if _SESSION_CACHE_KEY not in st.session_state:
+        st.session_state[_SESSION_CACHE_KEY] = LRUCache()
+    return st.session_state[_SESSION_CACHE_KEY]
+
+
+def _datetimes(transport):
+    """How row records encode datetimes: like the typed columns they join."""
+    return "epoch" if transport == "columnar" else "iso"
+
+
+def _serialize_data(df, transport, codes=()):
+    """
+    Encode `df` for `transport`, with the categorical columns in `codes`
+    as integer codes. The "columnar" transport returns a
+    ``(header, buffer)`` tuple, sent as the `data` and `data_buffer` args.
+    """
+    if transport == "arrow":
+        return df.reset_index(drop=True)
+    if transport == "columnar":
+        return encode_columnar(df, codes)
+    return to_records(df, codes=codes)
+
+
+def _full_payload(
+    df, transport, codes=(), prepare=None, compression=None, threshold=0, shared_key=None
+):
+    """
+    Serialize `df` to be sent in full: prepared, encoded and compressed.
+
+    With a `shared_key` (content fingerprint and row range), the payload
+    is packed into immutable bytes and kept in the process-wide shared
+    cache, so sessions sending the same rows reuse one serialization and
+    one copy in memory. Arrow payloads are converted by Streamlit in
+    each session and are not shared.
+
+    Returns
+    -------
+    tuple
+        ``(data, buffer)``; `buffer` is None for records and Arrow.
+    """
+    prepare = prepare or (lambda frame: frame)
+
+    def build():
+        data = _serialize_data(prepare(df), transport, codes)
+        data, buffer = data if isinstance(data, tuple) else (data, None)
+        if compression and transport != "arrow":
+            data, buffer = deflate_payload(data, buffer, threshold)
+        return data, buffer
+
+    if shared_key is None or transport == "arrow":
+        return build()
+
+    def packed():
+        data, buffer = build()
+        if isinstance(data, dict) and "compressed" in data:
+            return data, buffer
+        return pack_payload(data, buffer)
+
+    return shared_payloads.get_or_build(
+        (shared_key, transport, tuple(codes), compression, threshold),
+        packed,
+        size=lambda payload: len(payload[1]),
+    )
+
+
+def _search_index(df, key, id_col, searchable_cols):
+    """
+    The session's search index for table `key`, updated for `df`.
+
+    Kept next to the payload snapshots in the session cache, it follows
+    row changes incrementally between reruns.
+    """
+    cols = [c for c in searchable_cols if c in df.columns]
+    if not cols:
+        return None
+    cache = _session_cache()
+    index = cache.get((key, "search"))
+    if index is None or index.searchable_cols != cols or index.id_col != id_col:
+        index = SearchIndex(df, cols, id_col)
+    else:
+        index.update(df)
+    cache.put((key, "search"), index)
+    return index
+
+
+def _keyed_payload(
+    df, key, id_col, transport, resync, prepare=None, codes=(), config=(), deltas=True,
+    limit=None, encode=None,
+):
+    """
+    Decide what a keyed table has to send: nothing, a delta or everything.
+
+    The session cache remembers the fingerprint and row hashes of the last
+    snapshot sent for `key`. Unchanged data is omitted and small changes
+    go out as a delta against that snapshot. The frontend bumps `resync`
+    when it lacks the data it should hold (e.g. after a remount), which
+    forces a full send. `prepare` turns rows into what is actually sent
+    (adding asset columns) and only runs on rows that go out; `codes`
+    names the categorical columns sent as integer codes; `config`
+    holds everything besides `df` that changes those rows, and a delta
+    is only sent while it stays the same. `deltas=False` always sends
+    changed data in full. With `limit`, a full send only carries the first
+    `limit` rows; the frontend fetches the rest in chunks. `encode(frame,
+    fingerprint)` serializes the rows sent in full, by default without
+    compression or sharing.
+
+    Returns
+    -------
+    tuple
+        ``(data, fingerprint, delta)``; `data` is None unless sent in full.
+    """
+    prepare = prepare or (lambda frame: frame)
+    encode = encode or (lambda frame, _: _serialize_data(prepare(frame), transport, codes))
+    fingerprint = frame_fingerprint(df, transport, *config)
+    cache = _session_cache()
+    entry = cache.get(key)
+    snapshot = {"fingerprint": fingerprint, "resync": resync, "config": config}
+
+    if entry is not None and entry["resync"] == resync:
+        if entry["fingerprint"] == fingerprint:
+            return None, fingerprint, None
+        hashes = row_hashes(df, id_col)
+        delta = None
+        if deltas and entry["config"] == config:
+            datetimes = _datetimes(transport)
+            delta = compute_delta(
+                entry["hashes"], hashes, df, id_col, prepare,
+                lambda frame: to_records(frame, datetimes, codes),
+            )
+        if delta is not None:
+            delta["base"] = entry["fingerprint"]
+            cache.put(key, {**snapshot, "hashes": hashes})
+            return None, fingerprint, delta
+    else:
+        hashes = row_hashes(df, id_col)
+
+    data = encode(df if limit is None else df.iloc[:limit], fingerprint)
+    cache.put(key, {**snapshot, "hashes": hashes})
+    return data, fingerprint, None
+
 
 def st_datatables(
     df = None,
@@ -24,12 +212,29 @@ def st_datatables(
     orderable_cols=[],
     hidden_cols = [],
     searchable_cols=[],
+    filter_cols=None,
+    categorical_cols=None,
     select="single",
+    return_mode="rows",
+    selection_debounce=0,
+    commit_selection=False,
     scrollX=False, 
     scrollY=False,
     deferRender=True,
+    virtual=False,
     layout=None,
     actions=None,
+    asset_cols=None,
+    lazy_cols=None,
+    serverSide=False,
+    worker=False,
+    presort=False,
+    transport="records",
+    compression=None,
+    compression_threshold=1_000_000,
+    chunk_size=None,
+    shared_cache=False,
+    telemetry=False,
     key=None
     ):
     
@@ -43,7 +248,14 @@ def st_datatables(
 
     Parameters
     ----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or TableSource
+        The table, or with `serverSide=True` a file-backed source
+        (`ArrowSource` for Parquet/Arrow IPC files, `SQLiteSource`,
+        `DuckDBSource`) from which only the requested page is read. A
+        Polars ``LazyFrame`` or a DuckDB relation is wrapped into a
+        source (`PolarsSource`, `DuckDBSource`), so searching, ordering
+        and paging run as filter/sort/slice on the lazy query and only
+        the page is collected.
     pageLength : int, default 25
         Number of rows per page initially.
     lengthMenu : list[int], default [10, 25, 50, 100]
@@ -51,11 +263,54 @@ def st_datatables(
     orderable_cols : list[str], default []
         Column names that can be sorted.
     hidden_cols : list[str], default []
-        Column names to hide.
+        Column names to hide. With a `key` and a unique `id_col`, hidden
+        columns that are neither searchable nor orderable are left out of
+        the table data; when the user shows one (e.g. with the "colvis"
+        button) its values are fetched from Python in one request. Rows
+        returned by selections and action clicks do not include them; use
+        `get_selected_rows()` to read them from the DataFrame.
     searchable_cols : list[str], default []
         Column names that should be included in search.
+    filter_cols : list[str] or dict[str, str], optional
+        Columns with a filter widget in their header: a min/max range for
+        numbers, a date range for datetimes, a multi-select for
+        categoricals, booleans and columns with few distinct values, and
+        a text box otherwise. Pass ``{column: type}`` to choose the widget
+        ("range", "date", "select" or "text"). Filters combine with each
+        other and with the global search. With `serverSide=True` each
+        filter is evaluated as a NumPy mask on the DataFrame, cached per
+        filter so changing one does not recompute the others; file-backed
+        sources filter in their own query and, as their values are not
+        scanned up front, offer text boxes instead of multi-selects. Lazy
+        columns cannot be filtered.
+    categorical_cols : list[str] or "auto", optional
+        Columns to send dictionary-encoded: each distinct value travels
+        once in a dictionary and rows hold integer codes, which the browser
+        sorts on directly (codes follow the value order) while search and
+        display use the dictionary strings. Categorical dtypes always are;
+        "auto" adds string columns where at most 10% of the values are
+        distinct. Not used with `serverSide=True`; with
+        `transport="arrow"` the columns are Arrow dictionaries and the
+        browser works on their values.
     select : {"single", "multi", False}, default "single"
         Row selection mode: single row, multiple rows, or disabled.
+    return_mode : {"rows", "ids", "indexes"}, default "rows"
+        What selections and action clicks send back to Python. "rows" sends
+        the full row data, "ids" only the `id_col` values and "indexes"
+        only the DataTables row indexes, which are the positions of the
+        rows in `df` (changed data is then always sent in full, as row
+        deltas would shift them). "indexes" is not available with
+        `serverSide=True` or `worker=True`, where DataTables only holds
+        the drawn page. Use `get_selected_rows()` to look the rows up in
+        the DataFrame when they are needed.
+    selection_debounce : int, default 0
+        Milliseconds to wait after the last select/deselect event before
+        sending the selection, so a burst of clicks (shift-click ranges,
+        select all) causes a single rerun. 0 sends every change at once.
+    commit_selection : bool, default False
+        Hold selection changes in the browser until the user clicks an
+        "Apply selection" button above the table, then send them in one
+        rerun. Takes precedence over `selection_debounce`.
     scrollX : bool or str, default False
         Enable horizontal scrolling, or specify a CSS width.
     scrollY : bool or str, default False
@@ -63,6 +318,11 @@ def st_datatables(
     deferRender : bool, default True
         Only render rows as they are displayed (improves performance with
         images/SVGs and larger datasets).
+    virtual : bool, default False
+        Virtualize rows with the DataTables Scroller extension: instead of
+        pages, the table scrolls and only the rows around the viewport are
+        in the DOM. Uses `scrollY` as the viewport height ("480px" if not
+        set) and always defers rendering.
     layout : dict, optional
         DataTables v2 layout configuration, passed through directly.
         Example:
@@ -85,46 +345,354 @@ def st_datatables(
         "insertIndex": column number that actions column to be inserted,
         "btndirection": Direction of action buttons. "horizontal" or "vertical",
 
+    asset_cols : dict[str, AssetColumn], optional
+        Rendered columns to add in front of the DataFrame columns, e.g.
+        ``{"structure_svg": AssetColumn("SMILES", smiles_to_svg, size=(200, 200))}``.
+        Cells are rendered in a worker pool with a persistent disk cache,
+        and only for the rows being sent: the current page with
+        `serverSide=True`, the changed rows of a delta update. With a
+        `key`, asset columns are lazy (see `lazy_cols`).
+    lazy_cols : list[str], optional
+        Heavy columns (DataFrame or asset columns) left out of the table
+        data. After each draw the browser requests their values for the
+        visible rows it has not seen yet, in one batch, and caches them.
+        Requires `key` and a unique `id_col`; ignored with `serverSide=True`,
+        which only sends one page anyway.
+    serverSide : bool, default False
+        Keep the data in Python and only send the current page to the
+        browser. Paging, ordering (`orderable_cols`) and global search
+        (`searchable_cols`) are evaluated on the DataFrame, so the payload
+        size depends on `pageLength` rather than on the table size. Every
+        page/order/search change triggers a rerun, the initial order is
+        unsorted and selections only cover the current page. The search
+        uses a trigram index over `searchable_cols`, kept per session and
+        updated incrementally as rows change (matched on `id_col`), so a
+        keystroke does not scan every cell. Requires `key`.
+    worker : bool, default False
+        Run searching, ordering and paging in a Web Worker instead of the
+        browser's main thread. The data still lives in the browser, but
+        the worker keeps the searchable and orderable columns with their
+        sort orders and only answers with the rows of the page to draw,
+        so typing in the search box (debounced) does not freeze the table
+        on large data. Lazy columns cannot be searched or ordered. As in
+        server-side mode, DataTables only holds the drawn page: use
+        ``return_mode="rows"`` or ``"ids"`` to identify selected rows.
+        Ignored with `serverSide=True`.
+    presort : bool, default False
+        Sort every column of `orderable_cols` once in Python (stable
+        argsort with pandas/NumPy, text case-insensitive, empty cells
+        last) and send the rank of each row as compact Int32 arrays. The
+        browser then orders on these integers instead of comparing cell
+        values; with `worker=True` a sort click just walks the presorted
+        order. Changed data is always sent in full, as ranks refer to row
+        positions. Ignored with `serverSide=True`.
+    transport : {"records", "arrow", "columnar"}, default "records"
+        Wire format of the table data. "records" sends a JSON list of row
+        dicts, converted column by column (datetimes as ISO strings, NaN
+        and NA as null). "arrow" sends the DataFrame as columnar Apache
+        Arrow IPC. "columnar" encodes every column in one vectorized pass:
+        numbers, booleans, datetimes (epoch milliseconds) and categorical
+        codes go out as typed arrays in one binary buffer, and only other
+        columns as JSON lists. With "arrow" and "columnar" the browser
+        reads cells lazily from the column vectors, which is much cheaper
+        for wide or long tables. Ignored with `serverSide=True`, where
+        only one page is sent.
+    compression : {None, "deflate"}, default None
+        Compress the table data sent in full with deflate (zlib). The
+        browser inflates it with a streaming ``DecompressionStream``
+        before building the rows. Worth it on slow links: JSON tables
+        often compress about 10x. Applies to the "records" and
+        "columnar" transports; deltas and server-side pages are small
+        and stay uncompressed.
+    compression_threshold : int, default 1_000_000
+        Serialized size in bytes below which data is sent uncompressed.
+    chunk_size : int, optional
+        Load the table progressively: data sent in full only carries the
+        first `chunk_size` rows, so the first page shows at once whatever
+        the table size. The browser then requests the following rows
+        chunk by chunk (one rerun each) and appends them with
+        ``rows.add()`` (with `worker`, reloads the worker with them),
+        showing a loading indicator until all rows are in. Searching and
+        ordering cover the rows loaded so far. Requires `key`; ignored
+        with `serverSide=True`.
+    shared_cache : bool, default False
+        Share serialized data between sessions: payloads sent in full (and
+        progressive chunks and presorted ranks) are kept once per process
+        as immutable bytes, keyed by a fingerprint of their content, in a
+        cache bounded to 256 MB. When many users open the same table it
+        is serialized once. A hit still hashes the whole DataFrame, which
+        costs more than encoding plain records or columns: enable it when
+        the payload is expensive to build (compression, presorted ranks,
+        `prepare`) and shared by many sessions. Does not apply to
+        `transport="arrow"`, which Streamlit converts in each session.
+    telemetry : bool or callable, default False
+        Measure in the browser where a table spends its time and report
+        it back: the Python preparation time of the rerun that sent the
+        data, its transfer time (wall clocks of the server and browser
+        compared, so only as exact as they agree), parsing, DataTables
+        initialisation, time to the first draw, later draw durations and
+        main-thread long tasks. The first draw of new data reruns the
+        script to deliver its report; later draws (sorting, paging, and
+        server-side pages) are reported with the next rerun the table
+        causes anyway, e.g. a selection. Read the latest with
+        `get_telemetry(key)`, or
+        pass a callable to receive each report once, e.g. to log it to a
+        metrics system. Requires `key`.
     key : str, optional
-        Streamlit widget key.
+        Streamlit widget key. With a key, each table remembers a content
+        fingerprint of the last data it sent (bounded LRU per session):
+        unchanged data is not resent on reruns, and when only a few rows
+        were added, changed or removed (matched on `id_col`) just those
+        rows are sent and applied in place, keeping scroll and paging.
 
     Returns
     -------
     dict or None
         - On row selection:
             {"rows": [...], "indexes": [...], "count": int}
+            ("ids" instead of "rows" with return_mode="ids", neither
+            with return_mode="indexes")
         - On action button click:
             {<row data...>, "action": str, "_rowIndex": int}
+            (row data reduced to `id_col` with return_mode="ids" and
+            omitted with return_mode="indexes")
         - None if no interaction.
 
     """
-    columns = df.columns.tolist()
-    data = df.to_dict(orient="records")
+    started = time.perf_counter()
+    if serverSide and not key:
+        raise ValueError("serverSide=True requires a `key`")
+    if telemetry and not key:
+        raise ValueError("telemetry requires a `key`")
+    df = as_source(df)
+    if isinstance(df, TableSource) and not serverSide:
+        raise ValueError("A TableSource requires serverSide=True")
+    if return_mode not in _RETURN_MODES:
+        raise ValueError(f"Unknown return_mode: {return_mode!r}")
+    if return_mode == "indexes" and (serverSide or worker):
+        raise ValueError(
+            'return_mode="indexes" is page-relative with serverSide or worker; use "ids"'
+        )
+    if transport not in _TRANSPORTS:
+        raise ValueError(f"Unknown transport: {transport!r}")
+    if compression not in _COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression!r}")
+    if chunk_size is not None and not serverSide:
+        if not key:
+            raise ValueError("chunk_size requires a `key`")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive number of rows")
+
+    asset_cols = asset_cols or {}
+    columns = list(asset_cols) + list(df.columns)
+    lazy = []
+    if key and not serverSide:
+        lazy = list(dict.fromkeys(list(lazy_cols or []) + list(asset_cols)))
+    if id_col in lazy:
+        raise ValueError("`id_col` cannot be a lazy column")
+    eager_assets = {name: a for name, a in asset_cols.items() if name not in lazy}
+    projected = []
+    if key and not serverSide and id_col in df.columns:
+        projected = [
+            c for c in hidden_cols
+            if c in df.columns and c != id_col and c not in lazy
+            and c not in searchable_cols and c not in orderable_cols
+            and c not in (filter_cols or [])
+        ]
+        if projected and not df[id_col].is_unique:
+            projected = []
+    omitted = [c for c in lazy if c in df.columns] + projected
+    prepare = lambda frame: with_assets(frame.drop(columns=omitted), eager_assets)
+    asset_config = tuple((name, asset.config()) for name, asset in asset_cols.items())
+    internal = _internal_state(st.session_state.get(key)) if key else {}
+    datetimes = _datetimes(transport)
+    filters = []
+    column_filters = None
+    if filter_cols:
+        if not isinstance(filter_cols, dict):
+            filter_cols = dict.fromkeys(filter_cols)
+        wanted = {c: t for c, t in filter_cols.items() if c not in lazy}
+        if isinstance(df, TableSource):
+            # Column kinds from a sample; bounds would need a full scan.
+            filters = filter_specs(df.head(100), wanted, describe=False)
+        elif key:
+            # Kept between reruns: widgets and masks of the same DataFrame.
+            column_filters = _session_cache().get((key, "filters")) or ColumnFilters()
+            _session_cache().put((key, "filters"), column_filters)
+            column_filters.update(df, list(wanted))
+            filters = column_filters.specs(df, wanted)
+        else:
+            filters = filter_specs(df, wanted)
+    column_dictionaries = {}
+    if not serverSide:
+        encoded = [
+            c for c in categorical_columns(df, categorical_cols)
+            if c not in omitted and c != id_col
+        ]
+        df = as_categories(df, encoded)
+        if transport != "arrow":
+            column_dictionaries = {
+                c: d for c, d in dictionaries(df).items() if c not in omitted and c != id_col
+            }
+    codes = list(column_dictionaries)
+    payload_config = asset_config + (
+        tuple(lazy), tuple(projected), column_dictionaries, presort and tuple(orderable_cols)
+    )
+
+    def encode(frame, fingerprint, offset=0):
+        shared_key = (fingerprint, offset, len(frame)) if shared_cache and fingerprint else None
+        return _full_payload(
+            frame, transport, codes, prepare, compression, compression_threshold, shared_key
+        )
+
+    column_types = column_kinds(df.head(0) if isinstance(df, TableSource) else df)
+    column_types.update((name, "string") for name in asset_cols)
+    server_response = None
+    data_fingerprint = None
+    shared_fingerprint = None
+    data_delta = None
+    lazy_response = None
+    projected_response = None
+    chunk, chunk_offset = None, None
+    if serverSide:
+        request = pending_request(internal) or default_request(pageLength)
+        server_response = process_request(
+            df, request, searchable_cols, orderable_cols, prepare,
+            _search_index(df, key, id_col, searchable_cols)
+            if str(request.get("search") or "").strip() and isinstance(df, pd.DataFrame)
+            else None,
+            [spec["column"] for spec in filters], column_filters,
+        )
+        data = []
+    elif key:
+        data, data_fingerprint, data_delta = _keyed_payload(
+            df, key, id_col, transport, internal.get("resync"), prepare, codes, payload_config,
+            # Deltas would shift the positions "indexes" refers to.
+            deltas=not presort and return_mode != "indexes", limit=chunk_size, encode=encode,
+        )
+        shared_fingerprint = data_fingerprint
+        # Requests stay in the component value until the next one: answer
+        # each once, not on every rerun.
+        chunk_request = internal.get("chunk")
+        if (
+            chunk_size
+            and isinstance(chunk_request, dict)
+            and chunk_request.get("fingerprint") == data_fingerprint
+        ):
+            chunk_offset = int(chunk_request.get("offset") or 0)
+            # A resync reloads the first rows: their chunks are asked again.
+            requested = (data_fingerprint, chunk_offset, internal.get("resync"))
+            if _session_cache().get((key, "chunk")) != requested:
+                chunk = encode(
+                    df.iloc[chunk_offset:chunk_offset + chunk_size],
+                    data_fingerprint,
+                    chunk_offset,
+                )
+                _session_cache().put((key, "chunk"), requested)
+            else:
+                chunk_offset = None
+        lazy_request = internal.get("lazy")
+        if lazy and isinstance(lazy_request, dict):
+            seq = lazy_request.get("seq")
+            if _session_cache().get((key, "lazy")) != seq:
+                lazy_response = lazy_values(
+                    df, lazy_request.get("ids", []), lazy, asset_cols, id_col, datetimes
+                )
+                lazy_response["seq"] = seq
+                _session_cache().put((key, "lazy"), seq)
+        project_request = internal.get("project")
+        if projected and isinstance(project_request, dict):
+            seq = project_request.get("seq")
+            if _session_cache().get((key, "project")) != seq:
+                cols = [c for c in project_request.get("columns", []) if c in projected]
+                projected_response = column_values(df, cols, id_col, datetimes)
+                projected_response["seq"] = seq
+                _session_cache().put((key, "project"), seq)
+    else:
+        if shared_cache:
+            shared_fingerprint = frame_fingerprint(df, transport, *payload_config)
+        data = encode(df, shared_fingerprint)
+    data_buffer, chunk_buffer = None, None
+    if isinstance(data, tuple):
+        data, data_buffer = data
+    if isinstance(chunk, tuple):
+        chunk, chunk_buffer = chunk
+    ranks, ranks_buffer = None, None
+    if presort and not serverSide and data is not None:
+        if shared_cache and shared_fingerprint:
+            ranks, ranks_buffer = shared_payloads.get_or_build(
+                (shared_fingerprint, "ranks"),
+                lambda: sort_ranks(df, orderable_cols),
+                size=lambda payload: len(payload[1]),
+            )
+        else:
+            ranks, ranks_buffer = sort_ranks(df, orderable_cols)
 
     reset_nonce = None
     if key:
         reset_nonce = st.session_state.get(f"{key}__reset_nonce", 0)
+    telemetry_args = None
+    if telemetry:
+        telemetry_args = {
+            "prepare_ms": (time.perf_counter() - started) * 1000,
+            "sent_at": time.time() * 1000,
+        }
     
     component_value = _component_func(
         columns=columns,
         data=data,
+        data_buffer=data_buffer,
+        column_types=column_types,
+        dictionaries=column_dictionaries,
+        data_fingerprint=data_fingerprint,
+        data_delta=data_delta,
+        data_total=len(df) if chunk_size and not serverSide else None,
+        chunk=chunk,
+        chunk_buffer=chunk_buffer,
+        chunk_offset=chunk_offset,
+        presort=presort and not serverSide,
+        sort_ranks=ranks,
+        sort_buffer=ranks_buffer,
         id_col=id_col,
         pageLength=pageLength,
         lengthMenu=lengthMenu,
         orderable=orderable_cols,
         hidden=hidden_cols,
         searchable=searchable_cols,
+        filters=filters,
         select=select,
         scrollX=scrollX,
         scrollY=scrollY,
         deferRender=deferRender,
+        virtual=virtual,
         layout=layout,
         actions=actions,
+        lazy=lazy,
+        lazy_response=lazy_response,
+        projected=projected,
+        projected_response=projected_response,
+        serverSide=serverSide,
+        server_response=server_response,
+        worker=worker,
         key=key,
-        default={'rows': [], 'indexes': [], 'count': 0},
+        return_mode=return_mode,
+        selection_debounce=selection_debounce,
+        commit_selection=commit_selection,
+        default=_RETURN_MODES[return_mode],
         reset_nonce=reset_nonce,
+        telemetry=telemetry_args,
         )
 
+    report = _internal_state(component_value).get("telemetry")
+    if callable(telemetry) and isinstance(report, dict):
+        # Reports stay in the component value: pass each one on once.
+        if _session_cache().get((key, "telemetry")) != report.get("seq"):
+            _session_cache().put((key, "telemetry"), report.get("seq"))
+            telemetry(dict(report, key=key))
+
+    if isinstance(component_value, dict) and "_dt" in component_value:
+        component_value = {k: v for k, v in component_value.items() if k != "_dt"}
+
     return component_value
 
 
@@ -137,3 +705,64 @@ def reset_selection(key: str, *, rerun: bool = True) -> None:
     st.session_state[nonce_key] = st.session_state.get(nonce_key, 0) + 1
     if rerun:
         st.rerun()
+
+
+def get_telemetry(key):
+    """
+    Latest client-side timing report of the table with `key`.
+
+    Parameters
+    ----------
+    key : str
+        Key of a table rendered with `telemetry=True`.
+
+    Returns
+    -------
+    dict or None
+        ``{"key", "seq", "rows", "payload_bytes", "prepare_ms",
+        "transfer_ms", "parse_ms", "init_ms", "first_draw_ms", "draw_ms",
+        "long_task_ms"}``, durations in milliseconds (``draw_ms`` lists
+        the draws since the previous report; timings that do not apply to
+        the report are None), or None before the first report.
+    """
+    report = _internal_state(st.session_state.get(key)).get("telemetry")
+    return dict(report, key=key) if isinstance(report, dict) else None
+
+
+def get_selected_rows(df, selection, id_col="ID"):
+    """
+    Look up the rows of a selection or action click in the DataFrame.
+
+    Works with every `return_mode`: ids (or the `id_col` of returned rows)
+    are matched against `df[id_col]` in selection order, otherwise the
+    DataTables row indexes are used as positions in `df`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        The DataFrame passed to `st_datatables()`.
+    selection : dict
+        The value returned by `st_datatables()`.
+    id_col : str, default "ID"
+
+    Returns
+    -------
+    pandas.DataFrame
+        The selected rows, empty if nothing is selected.
+    """
+    if not selection:
+        return df.iloc[0:0]
+    if "action" in selection:
+        if id_col in selection:
+            ids = [selection[id_col]]
+        else:
+            return df.iloc[[selection["_rowIndex"]]]
+    elif "ids" in selection:
+        ids = selection["ids"]
+    elif "rows" in selection and id_col in df.columns:
+        ids = [r.get(id_col) for r in selection["rows"]]
+    else:
+        return df.iloc[list(selection.get("indexes", []))]
+
+    positions = pd.Index(df[id_col]).get_indexer(ids)
+    return df.iloc[positions[positions >= 0]]
@@ -0,0 +1,135 @@
+"""Fingerprinting and caching of serialized table payloads."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+CACHE_MAX_ENTRIES = 32
+# Memory bound of the payloads shared by all sessions of the process.
+SHARED_CACHE_MAX_BYTES = 256 * 2**20
+
+
+def frame_fingerprint(df, *config):
+    """
+    Return a short hex digest identifying the content of `df`.
+
+    The row hashes come from ``pandas.util.hash_pandas_object``, which works
+    column by column on the underlying blocks instead of per Python cell.
+    Column names, dtypes and any extra `config` values are mixed in so that
+    a change in how the table is presented also changes the fingerprint.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes], config)).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cells (lists, dicts): hash their string form instead.
+        h.update(pd.util.hash_pandas_object(df.astype(str), index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class LRUCache:
+    """A small least-recently-used mapping with a fixed number of entries."""
+
+    def __init__(self, maxsize=CACHE_MAX_ENTRIES):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedCache:
+    """
+    Process-wide least-recently-used cache bounded by the total size of
+    its values, shared by all Streamlit sessions (which run as threads of
+    one process).
+
+    Values must be treated as read-only by every session. When several
+    sessions miss the same key at once, one of them builds the value and
+    the others wait for it, so each value is built once.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Evict least recently used entries beyond this total size.
+    """
+
+    def __init__(self, max_bytes=SHARED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def _lookup(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def get_or_build(self, key, build, size=len):
+        """
+        Return the value cached for `key`, calling `build()` on a miss.
+
+        `size(value)` gives the bytes a built value counts against
+        `max_bytes`; values larger than that are returned without being
+        cached.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry[0]
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                entry = self._lookup(key)
+            if entry is not None:
+                return entry[0]
+            try:
+                value = build()
+                nbytes = size(value)
+                with self._lock:
+                    if nbytes <= self.max_bytes:
+                        self._entries[key] = (value, nbytes)
+                        self._bytes += nbytes
+                    while self._bytes > self.max_bytes:
+                        _, (_, evicted) = self._entries.popitem(last=False)
+                        self._bytes -= evicted
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """Total size of the cached values."""
+        return self._bytes
+
+
+shared_payloads = SharedCache()
@@ -0,0 +1,58 @@
+"""Row-level deltas between two snapshots of a table, keyed on `id_col`."""
+
+import pandas as pd
+
+from ._encoding import to_records
+
+# Above this share of changed rows a full resend is cheaper to apply.
+MAX_DELTA_FRACTION = 0.5
+
+
+def row_hashes(df, id_col):
+    """
+    Hash every row of `df`, indexed by its `id_col` value.
+
+    Returns None when the table has no usable id column, in which case
+    deltas cannot be computed and the data is always sent in full.
+    """
+    if id_col not in df.columns or not df[id_col].is_unique:
+        return None
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return pd.Series(hashes.to_numpy(), index=pd.Index(df[id_col].to_numpy()))
+
+
+def compute_delta(old_hashes, new_hashes, df, id_col, prepare=None, encode=None):
+    """
+    Describe how to turn the old snapshot into `df`.
+
+    `prepare` is applied to the added and updated rows before `encode`
+    (`to_records` by default) converts them to records.
+
+    Returns
+    -------
+    dict or None
+        ``{"add": [...], "update": [...], "remove": [...]}`` where added
+        and updated rows are records and removed rows are ids, or None
+        when the change is too large to be worth sending as a delta.
+    """
+    if old_hashes is None or new_hashes is None:
+        return None
+    added = new_hashes.index.difference(old_hashes.index)
+    removed = old_hashes.index.difference(new_hashes.index)
+    common = new_hashes.index.intersection(old_hashes.index)
+    changed = common[new_hashes.loc[common].to_numpy() != old_hashes.loc[common].to_numpy()]
+
+    if len(added) + len(removed) + len(changed) > MAX_DELTA_FRACTION * max(len(df), 1):
+        return None
+
+    prepare = prepare or (lambda frame: frame)
+    encode = encode or to_records
+    ids = df[id_col]
+    return {
+        "add": encode(prepare(df[ids.isin(added)])),
+        "update": encode(prepare(df[ids.isin(changed)])),
+        "remove": removed.tolist(),
+    }
@@ -0,0 +1,321 @@
+"""Vectorized, type-aware encoding of DataFrame columns for the browser.
+
+Every column is converted in one pass according to its dtype instead of
+going through ``DataFrame.to_dict`` cell by cell:
+
+- numbers become Int32/Float64 arrays (nulls as NaN),
+- datetimes become epoch milliseconds (ISO strings in `to_records`),
+- booleans become Uint8 (2 marks a null),
+- categoricals become Int32 codes plus a dictionary of their categories,
+- anything else is sent as a JSON list.
+
+Low-cardinality string columns can be turned into categoricals first
+(`categorical_columns`, `as_categories`) so repeated strings travel and
+live in the browser once, as dictionary entries.
+
+The "columnar" transport packs the typed arrays into one bytes buffer
+described by a JSON header; `to_records` uses the same conversion to
+produce JSON-safe row dicts for the other transports, pages and deltas.
+Either payload can be packed into immutable bytes (`pack_payload`) or
+deflated (`deflate_payload`).
+"""
+
+import datetime
+import decimal
+import json
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+
+_ALIGN = 8
+_INT32 = np.iinfo(np.int32)
+# Auto-detected categorical columns have at most this share of distinct values.
+CATEGORY_MAX_FRACTION = 0.1
+
+
+def column_kind(series):
+    """Classify a column as number, datetime, bool, category or string."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "number"
+    return "string"
+
+
+def _json_value(v):
+    if v is None or isinstance(v, (str, bool, int)):
+        return v
+    if isinstance(v, float):
+        return None if v != v else v
+    if isinstance(v, np.generic):
+        return _json_value(v.item())
+    if isinstance(v, decimal.Decimal):
+        return None if v.is_nan() else float(v)
+    if isinstance(v, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return None if pd.isna(v) else v.isoformat()
+    if v is pd.NA or v is pd.NaT:
+        return None
+    if isinstance(v, (list, tuple)):
+        return [_json_value(x) for x in v]
+    if isinstance(v, dict):
+        return {str(k): _json_value(x) for k, x in v.items()}
+    return str(v)
+
+
+def _epoch_ms(series):
+    """
+    Datetimes as float64 epoch milliseconds, NaN for NaT.
+
+    Timezone-aware values keep their wall time, so they display the same
+    as with ISO strings.
+    """
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_localize(None)
+    values = series.to_numpy(dtype="datetime64[ns]")
+    ms = (values.view("int64") // 1_000_000).astype("float64")
+    ms[np.isnat(values)] = np.nan
+    return ms
+
+
+def _iso(series):
+    """Datetimes as ISO strings in their own wall time, as an object array."""
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_localize(None)
+    values = series.to_numpy(dtype="datetime64[s]")
+    return np.datetime_as_string(values, unit="s").astype(object)
+
+
+def json_column(series, datetimes="iso", codes=False):
+    """
+    Convert one column to a list of JSON-safe Python values.
+
+    `datetimes` selects ISO strings ("iso") or epoch milliseconds ("epoch").
+    With `codes`, categoricals are sent as their integer codes.
+    """
+    kind = column_kind(series)
+    mask = series.isna().to_numpy()
+    if kind == "category" and codes:
+        values = series.cat.codes.to_numpy().astype(object)
+        kind = "number"
+    elif kind == "datetime":
+        if datetimes == "epoch":
+            values = np.nan_to_num(_epoch_ms(series)).astype("int64").astype(object)
+        else:
+            values = _iso(series)
+    elif kind in ("number", "bool"):
+        values = series.to_numpy(dtype=object)
+    else:
+        values = series.astype(object).to_numpy()
+    if mask.any():
+        if not values.flags.writeable:
+            values = values.copy()
+        values[mask] = None
+    values = values.tolist()
+    if kind in ("category", "string") or (kind == "number" and series.dtype == object):
+        values = [v if v is None or type(v) is str else _json_value(v) for v in values]
+    elif kind == "number":
+        # Python floats/ints after tolist(); only non-finite values need care.
+        values = [None if type(v) is float and (v != v or v in (np.inf, -np.inf)) else v for v in values]
+    return values
+
+
+def to_records(df, datetimes="iso", codes=()):
+    """
+    JSON-safe equivalent of ``df.to_dict(orient="records")``.
+
+    Categorical columns named in `codes` are sent as their integer codes.
+    """
+    names = [str(c) for c in df.columns]
+    columns = [
+        json_column(df.iloc[:, j], datetimes, names[j] in codes) for j in range(df.shape[1])
+    ]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def categorical_columns(df, categorical_cols=None):
+    """
+    Names of the columns of `df` to send dictionary-encoded.
+
+    Categorical dtypes always are. `categorical_cols` adds columns by name,
+    or "auto" adds the string columns whose share of distinct values is at
+    most `CATEGORY_MAX_FRACTION`.
+    """
+    names = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    if categorical_cols == "auto":
+        for c in df.columns:
+            if c in names or column_kind(df[c]) != "string" or not len(df):
+                continue
+            try:
+                distinct = df[c].nunique()
+            except TypeError:
+                continue
+            if distinct <= CATEGORY_MAX_FRACTION * len(df):
+                names.append(c)
+    elif categorical_cols:
+        names += [c for c in categorical_cols if c in df.columns and c not in names]
+    return names
+
+
+def as_categories(df, cols):
+    """
+    Return `df` with `cols` as categoricals whose codes follow the sort
+    order of their values, so the browser can sort on the codes. Ordered
+    categoricals keep their own order.
+    """
+    if not cols:
+        return df
+    out = df.copy(deep=False)
+    for c in cols:
+        series = df[c]
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            try:
+                series = series.astype("category")
+            except TypeError:
+                continue
+        if not series.cat.ordered:
+            categories = series.cat.categories
+            # Text sorts case-insensitively, like DataTables.
+            key = (lambda v: str(v).lower()) if categories.inferred_type == "string" else None
+            try:
+                series = series.cat.reorder_categories(sorted(categories, key=key))
+            except TypeError:
+                pass
+        out[c] = series
+    return out
+
+
+def dictionaries(df):
+    """``{column: categories}`` for the categorical columns of `df`."""
+    return {
+        str(c): [_json_value(v) for v in df.iloc[:, j].cat.categories.tolist()]
+        for j, c in enumerate(df.columns)
+        if isinstance(df.iloc[:, j].dtype, pd.CategoricalDtype)
+    }
+
+
+def _typed(series, kind):
+    """Return ``(dtype name, numpy array)`` for typed-array columns."""
+    if kind == "number":
+        if pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+            values = series.to_numpy()
+            if len(values) == 0 or (values.min() >= _INT32.min and values.max() <= _INT32.max):
+                return "int32", values.astype("<i4")
+        return "float64", series.to_numpy(dtype="float64", na_value=np.nan).astype("<f8")
+    if kind == "datetime":
+        return "float64", _epoch_ms(series).astype("<f8")
+    if kind == "bool":
+        mask = series.isna().to_numpy()
+        values = series.fillna(False).to_numpy(dtype=bool).astype("<u1")
+        values[mask] = 2
+        return "uint8", values
+    if kind == "category":
+        return "int32", series.cat.codes.to_numpy().astype("<i4")
+    return None, None
+
+
+def column_kinds(df):
+    """``{column: kind}`` for every column of `df`."""
+    return {str(c): column_kind(df.iloc[:, j]) for j, c in enumerate(df.columns)}
+
+
+def encode_columnar(df, codes=()):
+    """
+    Encode `df` for the "columnar" transport.
+
+    Categorical columns named in `codes` are sent as their integer codes,
+    other categoricals as value lists.
+
+    Returns
+    -------
+    tuple
+        ``(header, buffer)``: a JSON-safe header describing each column and
+        a bytes buffer holding the typed arrays at 8-byte aligned offsets.
+        String columns are carried in the header as value lists and
+        coded categoricals as int32 codes; see `dictionaries`.
+    """
+    chunks = []
+    offset = 0
+    specs = []
+    for j, name in enumerate(df.columns):
+        series = df.iloc[:, j]
+        kind = column_kind(series)
+        spec = {"name": str(name), "kind": kind}
+        if kind == "category" and str(name) not in codes:
+            kind = "string"
+        dtype, values = _typed(series, kind)
+        if dtype is None:
+            spec["values"] = json_column(series)
+        else:
+            data = values.tobytes()
+            spec.update(dtype=dtype, offset=offset, length=len(values))
+            padding = -len(data) % _ALIGN
+            chunks.append(data + b"\0" * padding)
+            offset += len(data) + padding
+        specs.append(spec)
+    header = {"format": "columnar", "rows": len(df), "columns": specs}
+    return header, b"".join(chunks)
+
+
+def _raw_payload(data, buffer=None):
+    """
+    Serialize a records list or a columnar ``(header, buffer)`` payload
+    into one bytes object: the JSON of `data`, followed for columnar
+    payloads by its length prefix, padding and `buffer`.
+
+    Returns
+    -------
+    tuple
+        ``(raw, format)`` with format "records" or "columnar".
+    """
+    text = json.dumps(data, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    if buffer is None:
+        return text, "records"
+    # Keep the typed arrays 8-byte aligned after the header.
+    padding = b"\0" * (-(4 + len(text)) % _ALIGN)
+    return b"".join([struct.pack("<I", len(text)), text, padding, buffer]), "columnar"
+
+
+def pack_payload(data, buffer=None):
+    """
+    Pack a records list or a columnar ``(header, buffer)`` payload into
+    immutable bytes, uncompressed.
+
+    Returns
+    -------
+    tuple
+        A descriptor ``{"compressed": "identity", "format": ..., "size":
+        ...}`` and the bytes, read by the browser like a deflated payload
+        without the inflating.
+    """
+    raw, fmt = _raw_payload(data, buffer)
+    return {"compressed": "identity", "format": fmt, "size": len(raw)}, raw
+
+
+def deflate_payload(data, buffer=None, threshold=0, level=6):
+    """
+    Compress a records list or a columnar ``(header, buffer)`` payload.
+
+    The serialized payload (see `pack_payload`) is deflated with zlib,
+    which the browser's ``DecompressionStream("deflate")`` reads as a
+    stream.
+
+    Returns
+    -------
+    tuple
+        ``(data, buffer)`` unchanged when the serialized payload is
+        smaller than `threshold` bytes, else a small descriptor
+        ``{"compressed": "deflate", "format": ..., "size": ...}`` and the
+        compressed bytes.
+    """
+    raw, fmt = _raw_payload(data, buffer)
+    if len(raw) < threshold:
+        return data, buffer
+    descriptor = {"compressed": "deflate", "format": fmt, "size": len(raw)}
+    return descriptor, zlib.compress(raw, level)
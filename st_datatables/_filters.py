@@ -0,0 +1,205 @@
+"""Per-column filters shown in the table header.
+
+`filter_specs` describes the widget of every filtered column (a value
+range for numbers, a date range for datetimes, a multi-select for
+categoricals and booleans, a text box otherwise). The browser answers
+clauses itself for client-side tables; in server-side mode every clause
+becomes a NumPy boolean mask over the DataFrame, cached per clause in
+`ColumnFilters` so changing one filter does not recompute the others.
+
+A clause is ``{"column": name}`` plus ``"min"``/``"max"`` (numbers, or
+``YYYY-MM-DD`` dates with `max` inclusive), ``"values"`` (selected
+values) or ``"text"`` (case-insensitive substring).
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from ._encoding import _json_value, column_kind
+
+# Columns with more distinct values get a text box instead of a multi-select.
+FILTER_MAX_OPTIONS = 200
+_FILTER_TYPES = ("range", "date", "select", "text")
+_DEFAULT_TYPES = {"number": "range", "datetime": "date", "category": "select", "bool": "select"}
+
+
+def _wall_time(series):
+    """Datetimes without timezone, keeping their wall time."""
+    if getattr(series.dt, "tz", None) is not None:
+        return series.dt.tz_localize(None)
+    return series
+
+
+def filter_specs(df, filter_cols, describe=True):
+    """
+    Widgets for the `filter_cols` of `df`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Used for the column kinds, value bounds and options.
+    filter_cols : list[str] or dict[str, str]
+        Column names, or ``{column: type}`` to choose the widget type
+        ("range", "date", "select" or "text").
+    describe : bool, default True
+        Read bounds and options from the values of `df`. Without it (`df`
+        is only a sample of a file-backed source), multi-selects are only
+        offered for booleans and other columns get a text box.
+
+    Returns
+    -------
+    list[dict]
+        ``{"column", "type"}`` plus ``"min"``/``"max"`` bounds for ranges
+        and ``"options"`` for multi-selects.
+    """
+    if not isinstance(filter_cols, dict):
+        filter_cols = dict.fromkeys(filter_cols or [])
+    specs = []
+    for col, kind in filter_cols.items():
+        if col not in df.columns:
+            continue
+        if kind is not None and kind not in _FILTER_TYPES:
+            raise ValueError(f"Unknown filter type for {col!r}: {kind!r}")
+        series = df[col]
+        values = series.dropna()
+        if kind is None:
+            kind = _DEFAULT_TYPES.get(column_kind(series), "text")
+            if kind == "text" and describe and len(values):
+                try:
+                    if values.nunique() <= FILTER_MAX_OPTIONS:
+                        kind = "select"
+                except TypeError:
+                    pass
+        if not describe:
+            if kind == "select" and not pd.api.types.is_bool_dtype(series.dtype):
+                kind = "text"
+            values = values.iloc[:0]
+        spec = {"column": str(col), "type": kind}
+        if kind == "range" and len(values):
+            lo, hi = values.agg(["min", "max"]).tolist()
+            spec.update(min=_json_value(lo), max=_json_value(hi))
+        elif kind == "date" and len(values):
+            values = _wall_time(values)
+            spec.update(
+                min=values.min().strftime("%Y-%m-%d"), max=values.max().strftime("%Y-%m-%d")
+            )
+        elif kind == "select":
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                options = values.cat.categories
+            else:
+                options = values.unique()
+            try:
+                options = sorted(options)
+            except TypeError:
+                options = list(options)
+            spec["options"] = [_json_value(v) for v in options[:FILTER_MAX_OPTIONS]]
+            if not describe:
+                spec["options"] = [False, True]
+        specs.append(spec)
+    return specs
+
+
+def active_clauses(filters, columns):
+    """The clauses of `filters` on `columns` that actually restrict rows."""
+    out = []
+    for clause in filters or []:
+        if not isinstance(clause, dict) or clause.get("column") not in columns:
+            continue
+        if clause.get("values") or clause.get("text") or any(
+            clause.get(k) not in (None, "") for k in ("min", "max")
+        ):
+            out.append(clause)
+    return out
+
+
+def clause_mask(series, clause):
+    """Boolean NumPy mask of the values of `series` passing `clause`."""
+    if clause.get("values"):
+        values = clause["values"]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            values = [v for v in values if isinstance(v, bool)]
+        return series.isin(values).to_numpy()
+    if clause.get("text"):
+        text = str(clause["text"]).lower()
+        found = series.astype(str).str.lower().str.contains(text, regex=False)
+        return (found & series.notna()).to_numpy(dtype=bool)
+    lo, hi = clause.get("min"), clause.get("max")
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = _wall_time(series)
+        mask = values.notna()
+        if lo not in (None, ""):
+            mask &= values >= pd.Timestamp(lo)
+        if hi not in (None, ""):
+            # The last day is included.
+            mask &= values < pd.Timestamp(hi) + pd.Timedelta(days=1)
+        return mask.to_numpy(dtype=bool)
+    values = pd.to_numeric(series, errors="coerce")
+    mask = values.notna()
+    if lo not in (None, ""):
+        mask &= values >= float(lo)
+    if hi not in (None, ""):
+        mask &= values <= float(hi)
+    return mask.to_numpy(dtype=bool)
+
+
+class ColumnFilters:
+    """
+    Filter widgets and clause masks of a DataFrame, kept between reruns.
+
+    `update` compares every filtered column with a copy of the values its
+    widget and masks were computed from, once per rerun. This is much
+    cheaper than hashing the column or computing a mask, so a DataFrame
+    rebuilt on every rerun keeps its cache, and a column changed (even in
+    place) only recomputes its own widget and masks.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._specs = {}
+        self._masks = {}
+
+    def update(self, df, columns):
+        """Forget what was computed from the `columns` of `df` that changed."""
+        self._values = {c: v for c, v in self._values.items() if c in columns}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            kept = self._values.get(col)
+            if kept is not None and kept.equals(series):
+                continue
+            self._values[col] = series.copy()
+            self._specs = {k: v for k, v in self._specs.items() if k[0] != col}
+            self._masks = {k: v for k, v in self._masks.items() if k[0] != col}
+
+    def specs(self, df, filter_cols):
+        """`filter_specs` of `df`, the DataFrame last passed to `update`."""
+        if not isinstance(filter_cols, dict):
+            filter_cols = dict.fromkeys(filter_cols or [])
+        specs = []
+        for col, kind in filter_cols.items():
+            key = (col, kind)
+            if key not in self._specs:
+                self._specs[key] = filter_specs(df, {col: kind})
+            specs += self._specs[key]
+        return specs
+
+    def mask(self, df, clauses):
+        """
+        Combined boolean NumPy mask of the rows of `df` (the DataFrame last
+        passed to `update`) passing every clause, or None without clauses.
+        """
+        if not clauses:
+            return None
+        masks = {}
+        for clause in clauses:
+            key = (clause["column"], json.dumps(clause, sort_keys=True, default=str))
+            if key not in masks:
+                masks[key] = self._masks.get(key)
+                if masks[key] is None:
+                    masks[key] = clause_mask(df[clause["column"]], clause)
+        # Only keep the masks of the current clauses.
+        self._masks = masks
+        return np.logical_and.reduce(list(masks.values()))
@@ -0,0 +1,47 @@
+"""Values of columns left out of the table data, fetched by the browser:
+lazy columns for the visible rows, projected hidden columns in bulk."""
+
+import pandas as pd
+
+from ._encoding import json_column
+
+
+def lazy_values(df, ids, cols, asset_cols, id_col, datetimes="iso"):
+    """
+    Look up the `cols` values of the rows whose `id_col` is in `ids`.
+
+    Asset columns are rendered for those rows only. Unknown ids are
+    dropped from the answer. `datetimes` is passed to `json_column`.
+
+    Returns
+    -------
+    dict
+        ``{"ids": [...], "values": {col: [...]}}`` with values aligned
+        to the returned ids.
+    """
+    positions = pd.Index(df[id_col]).get_indexer(ids)
+    found = positions >= 0
+    rows = df.iloc[positions[found]]
+    values = {}
+    for col in cols:
+        if col in asset_cols:
+            values[col] = asset_cols[col].render_values(rows[asset_cols[col].source])
+        else:
+            values[col] = json_column(rows[col], datetimes)
+    return {"ids": [i for i, ok in zip(ids, found) if ok], "values": values}
+
+
+def column_values(df, cols, id_col, datetimes="iso"):
+    """
+    All values of `cols`, for hidden columns the browser reveals.
+
+    Returns
+    -------
+    dict
+        ``{"ids": [...], "values": {col: [...]}}`` with values aligned
+        to the `id_col` values of every row.
+    """
+    return {
+        "ids": json_column(df[id_col], datetimes),
+        "values": {col: json_column(df[col], datetimes) for col in cols},
+    }
@@ -0,0 +1,66 @@
+"""Sort orders of orderable columns, computed once in Python.
+
+With ``presort=True`` the browser does not compare cell values to sort:
+for every orderable column it receives the rank of each row, taken from a
+stable argsort done here with pandas/NumPy. Equal values share a rank
+(the sorted position of the first of them), so ranks also serve as tie
+keys when several columns are ordered.
+"""
+
+import numpy as np
+
+from ._encoding import column_kind
+
+
+def _sort_keys(series):
+    """Values to sort `series` on: text case-insensitively, like DataTables."""
+    values = series.reset_index(drop=True)
+    if column_kind(values) == "string":
+        return values.astype(str).str.lower().where(values.notna())
+    return values
+
+
+def column_ranks(series):
+    """Int32 rank of every row of `series` in ascending order."""
+    keys = _sort_keys(series)
+    ordered = keys.sort_values(kind="mergesort", na_position="last")
+    perm = ordered.index.to_numpy()
+    ranks = np.empty(len(perm), dtype="<i4")
+    if not len(perm):
+        return ranks
+    # Missing values are sorted last; only the values before them are
+    # compared, as comparisons with pd.NA are not booleans.
+    present = int(ordered.notna().sum())
+    values = ordered.iloc[:present].to_numpy()
+    same = np.ones(len(perm) - 1, dtype=bool)
+    if present > 1:
+        same[:present - 1] = values[1:] == values[:-1]
+    if 0 < present < len(perm):
+        same[present - 1] = False
+    # A row ranks at the first sorted position of its run of equal values.
+    first = np.where(np.append(False, same), 0, np.arange(len(perm)))
+    ranks[perm] = np.maximum.accumulate(first)
+    return ranks
+
+
+def sort_ranks(df, cols):
+    """
+    Ranks of the `cols` of `df` for the browser.
+
+    Returns
+    -------
+    tuple
+        ``(header, buffer)``: ``{"rows": n, "columns": {name: offset}}``
+        and the Int32 rank arrays at those byte offsets.
+    """
+    offsets = {}
+    chunks = []
+    offset = 0
+    for col in cols:
+        if col not in df.columns:
+            continue
+        data = column_ranks(df[col]).tobytes()
+        offsets[str(col)] = offset
+        chunks.append(data)
+        offset += len(data)
+    return {"rows": len(df), "columns": offsets}, b"".join(chunks)
@@ -0,0 +1,201 @@
+"""Trigram index over the searchable columns for server-side search.
+
+Every row's searchable cells are joined into one lower-cased text. The
+index maps each byte trigram of those texts to the sorted positions of
+the rows containing it, built with numpy in one pass. A search term of
+three or more characters only verifies the rows found in all of its
+trigram postings instead of scanning every cell; shorter terms fall back
+to a vectorized scan of the rows left by the other terms.
+
+When the table has a unique `id_col`, the index follows changes between
+reruns incrementally: rows that were removed or changed are masked out
+of the postings and changed or added rows are kept in a small overlay
+that is scanned directly, until it grows past `REBUILD_FRACTION` of the
+table and the index is rebuilt. Each update first compares the indexed
+columns with a copy kept from the last one, which is much cheaper than
+hashing them (or than scanning them for the search): rows are only
+hashed when something changed, in place or not.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._cache import frame_fingerprint
+from ._delta import row_hashes
+
+# Rebuild once this share of rows lives in the overlay or is masked out.
+REBUILD_FRACTION = 0.1
+# Separates the columns of a row's text (and rows in the trigram pass), so
+# no trigram and no search term spans two cells.
+_SEP = "\x00"
+
+
+def cell_text(series):
+    """Cells of `series` as text, missing values as empty strings."""
+    return series.astype(str).where(series.notna(), "")
+
+
+def row_texts(df, searchable_cols):
+    """Lower-cased searchable text of every row, cells joined by `_SEP`."""
+    text = cell_text(df[searchable_cols[0]])
+    for col in searchable_cols[1:]:
+        text = text + _SEP + cell_text(df[col])
+    return text.str.lower()
+
+
+def _trigrams(data):
+    """Trigram codes of a uint8 array, with a mask of those not spanning `_SEP`."""
+    data = data.astype(np.int32)
+    grams = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    valid = (data[:-2] != 0) & (data[1:-1] != 0) & (data[2:] != 0)
+    return grams, valid
+
+
+class SearchIndex:
+    """
+    Trigram inverted index answering DataTables "smart" searches.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    searchable_cols : list[str]
+    id_col : str
+        Column identifying rows across updates; without unique values
+        every change rebuilds the index.
+    """
+
+    def __init__(self, df, searchable_cols, id_col):
+        self.searchable_cols = list(searchable_cols)
+        self.id_col = id_col
+        self._build(df)
+
+    def _frame(self, df):
+        cols = list(dict.fromkeys([self.id_col] + self.searchable_cols))
+        return df[[c for c in cols if c in df.columns]]
+
+    def _build(self, df):
+        texts = row_texts(df, self.searchable_cols)
+        self._series = texts.reset_index(drop=True)
+        frame = self._frame(df)
+        self._columns = frame.copy()
+        self._hashes = row_hashes(frame, self.id_col)
+        self._fingerprint = None if self._hashes is not None else frame_fingerprint(frame)
+        self._ids = None if self._hashes is None else self._hashes.index
+        self._dead = np.zeros(len(df), dtype=bool)
+        self._overlay = {}
+        self._aligned = True
+
+        self._grams = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = np.empty(0, dtype=np.int32)
+        n = len(texts)
+        encoded = [t.encode("utf-8") for t in texts.tolist()]
+        data = np.frombuffer(_SEP.encode().join(encoded), dtype=np.uint8)
+        if n == 0 or len(data) < 3:
+            return
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+        starts = np.concatenate([[0], np.cumsum(lengths + 1)[:-1]])
+        grams, valid = _trigrams(data)
+        rows = np.searchsorted(starts, np.arange(len(grams)), side="right") - 1
+        # Sort (trigram, row) pairs once; postings are the runs per trigram.
+        keys = np.sort(grams[valid].astype(np.int64) * n + rows[valid])
+        if not len(keys):
+            # Every cell is shorter than a trigram.
+            return
+        keys = keys[np.append(True, keys[1:] != keys[:-1])]
+        codes = keys // n
+        self._postings = (keys % n).astype(np.int32)
+        first = np.flatnonzero(np.append(True, codes[1:] != codes[:-1]))
+        self._grams = codes[first]
+        self._offsets = np.append(first, len(codes))
+
+    def update(self, df):
+        """Bring the index up to date with `df`, incrementally if possible."""
+        frame = self._frame(df)
+        if frame.equals(self._columns):
+            return
+        self._columns = frame.copy()
+        hashes = row_hashes(frame, self.id_col)
+        if self._hashes is None or hashes is None:
+            if hashes is not None or frame_fingerprint(frame) != self._fingerprint:
+                self._build(df)
+            return
+        old = self._hashes
+        if hashes.index.equals(old.index) and (hashes.to_numpy() == old.to_numpy()).all():
+            return
+
+        added = hashes.index.difference(old.index)
+        removed = old.index.difference(hashes.index)
+        common = hashes.index.intersection(old.index)
+        changed = common[hashes.loc[common].to_numpy() != old.loc[common].to_numpy()]
+
+        stale = removed.append(changed)
+        positions = self._ids.get_indexer(stale)
+        self._dead[positions[positions >= 0]] = True
+        for key in stale:
+            self._overlay.pop(key, None)
+        fresh = added.append(changed)
+        if len(fresh):
+            rows = df[df[self.id_col].isin(fresh)]
+            texts = row_texts(rows, self.searchable_cols)
+            self._overlay.update(zip(rows[self.id_col].tolist(), texts.tolist()))
+
+        self._hashes = hashes
+        self._aligned = False
+        if len(self._overlay) + self._dead.sum() > REBUILD_FRACTION * max(len(df), 1):
+            self._build(df)
+
+    def _postings_of(self, term):
+        """Posting lists of the trigrams of `term`, None if it has none."""
+        data = np.frombuffer(term.encode("utf-8"), dtype=np.uint8)
+        if len(data) < 3:
+            return None
+        postings = []
+        for code in np.unique(_trigrams(data)[0]):
+            i = np.searchsorted(self._grams, code)
+            if i == len(self._grams) or self._grams[i] != code:
+                return [np.empty(0, dtype=np.int32)]
+            postings.append(self._postings[self._offsets[i]:self._offsets[i + 1]])
+        return postings
+
+    def _positions(self, terms):
+        """Sorted positions of the indexed rows containing all `terms`."""
+        postings = []
+        for term in terms:
+            postings += self._postings_of(term) or []
+        positions = None
+        for posting in sorted(postings, key=len):
+            positions = (
+                posting if positions is None
+                else np.intersect1d(positions, posting, assume_unique=True)
+            )
+            if not len(positions):
+                return positions
+        # Only a single trigram is matched exactly by its posting; check
+        # shorter and longer terms on the remaining rows.
+        for term in terms:
+            if len(term.encode("utf-8")) == 3:
+                continue
+            texts = self._series if positions is None else self._series.iloc[positions]
+            found = texts.str.contains(term, regex=False).to_numpy()
+            positions = np.flatnonzero(found) if positions is None else positions[found]
+        return positions
+
+    def mask(self, df, search):
+        """
+        Boolean mask over `df` (the frame last passed to `update`) of the
+        rows matching `search`, or None for an empty search.
+        """
+        terms = str(search or "").lower().split()
+        if not terms:
+            return None
+        positions = self._positions(list(dict.fromkeys(terms)))
+        positions = positions[~self._dead[positions]]
+
+        if self._aligned:
+            out = np.zeros(len(df), dtype=bool)
+            out[positions] = True
+            return pd.Series(out, index=df.index)
+        ids = list(self._ids[positions])
+        ids += [key for key, text in self._overlay.items() if all(t in text for t in terms)]
+        return df[self.id_col].isin(ids)
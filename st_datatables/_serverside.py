@@ -0,0 +1,130 @@
+"""Server-side processing for `st_datatables`.
+
+When a table runs with ``serverSide=True`` the browser never receives the
+full dataset. DataTables sends its page/order/search request back to
+Python through the component value, and the functions in this module
+answer it from the DataFrame (or a file-backed `TableSource`) so only the
+current page crosses the wire.
+"""
+
+import pandas as pd
+
+from ._encoding import to_records
+from ._filters import ColumnFilters, active_clauses
+from ._search_index import cell_text
+from .sources import TableSource
+
+
+def default_request(pageLength):
+    """Return the request answered before the browser has sent one."""
+    return {"draw": 0, "start": 0, "length": pageLength, "order": [], "search": ""}
+
+
+def pending_request(internal):
+    """Extract the last DataTables request from the frontend's `_dt` state."""
+    request = internal.get("request")
+    return request if isinstance(request, dict) else None
+
+
+def search_mask(df, search, searchable_cols, index=None):
+    """
+    Boolean mask of rows matching a DataTables-style global search.
+
+    The search string is split on whitespace and every term must appear
+    (case-insensitive substring) in at least one of `searchable_cols`,
+    which mirrors DataTables' client-side "smart" search. An up-to-date
+    `SearchIndex` over those columns answers without scanning every cell.
+    """
+    terms = str(search or "").split()
+    if not terms:
+        return None
+    if index is not None:
+        return index.mask(df, search)
+    mask = pd.Series(True, index=df.index)
+    if not searchable_cols:
+        return ~mask
+    # Missing values match nothing, as in the index.
+    haystacks = [cell_text(df[c]) for c in searchable_cols]
+    for term in terms:
+        term_mask = pd.Series(False, index=df.index)
+        for values in haystacks:
+            term_mask |= values.str.contains(term, case=False, regex=False, na=False)
+        mask &= term_mask
+    return mask
+
+
+def sort_frame(df, order, orderable_cols):
+    """Sort `df` by a list of ``{"column": name, "dir": "asc"|"desc"}``."""
+    order = [o for o in order or [] if o.get("column") in orderable_cols]
+    if not order:
+        return df
+    by = [o["column"] for o in order]
+    ascending = [o.get("dir", "asc") != "desc" for o in order]
+    try:
+        return df.sort_values(by=by, ascending=ascending, kind="mergesort", na_position="last")
+    except TypeError:
+        # Mixed-type object columns: fall back to DataTables' string ordering.
+        return df.sort_values(
+            by=by, ascending=ascending, kind="mergesort", na_position="last",
+            key=lambda s: s.astype(str),
+        )
+
+
+def process_request(
+    df, request, searchable_cols, orderable_cols, prepare=None, index=None,
+    filter_cols=(), filters=None,
+):
+    """
+    Answer a DataTables server-side request from a DataFrame.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or TableSource
+        A source answers the search, order and page itself.
+    request : dict
+        ``{"draw", "start", "length", "order", "search", "filters"}`` as
+        sent by the frontend; ``length == -1`` means "all rows".
+    searchable_cols, orderable_cols : list[str]
+        Columns the global search and ordering may use.
+    prepare : callable, optional
+        Applied to the page before conversion, e.g. to render asset columns
+        for the visible rows only.
+    index : SearchIndex, optional
+        Index over `searchable_cols`, updated for `df`, used for the search.
+    filter_cols : list[str], optional
+        Columns the request's ``"filters"`` clauses may use.
+    filters : ColumnFilters, optional
+        Cache of clause masks kept between requests on the same `df`.
+
+    Returns
+    -------
+    dict
+        ``{"request", "recordsTotal", "recordsFiltered", "data"}`` where
+        ``data`` holds only the requested page as records.
+    """
+    start = max(int(request.get("start") or 0), 0)
+    length = int(request.get("length") or 0)
+    clauses = active_clauses(request.get("filters"), filter_cols)
+    if isinstance(df, TableSource):
+        order = [o for o in request.get("order") or [] if o.get("column") in orderable_cols]
+        page, filtered = df.query(
+            request.get("search"), searchable_cols, order, start, length, clauses
+        )
+    else:
+        mask = search_mask(df, request.get("search"), searchable_cols, index)
+        passing = (filters or ColumnFilters()).mask(df, clauses)
+        if passing is not None:
+            mask = passing if mask is None else mask.to_numpy(dtype=bool) & passing
+        rows = df if mask is None else df[mask]
+        rows = sort_frame(rows, request.get("order"), orderable_cols)
+        page = rows.iloc[start:] if length < 0 else rows.iloc[start:start + length]
+        filtered = len(rows)
+    if prepare is not None:
+        page = prepare(page)
+
+    return {
+        "request": request,
+        "recordsTotal": len(df),
+        "recordsFiltered": filtered,
+        "data": to_records(page),
+    }
@@ -0,0 +1,211 @@
+"""Rendered asset columns (images, SVG structures, ...) for `st_datatables`.
+
+An `AssetColumn` derives one display column from a source column by calling
+a per-cell render function, e.g. SMILES -> SVG. Rendering runs in a worker
+pool shared by the whole process, and every result is kept in a
+persistent on-disk cache keyed by the render function (its name, code and
+`version`), the input value and the size, so a value is only ever
+rendered once per machine. `st_datatables()` only renders the rows it is
+about to send (one page in server-side mode).
+"""
+
+import hashlib
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "st_datatables", "assets")
+
+# Long-lived pools by (processes, max_workers), shared by every asset column
+# and session: starting workers (and importing the render module in them)
+# costs more than rendering a page.
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _call_render(render, value, size):
+    return render(value, *size)
+
+
+def _executor(processes, max_workers):
+    with _executors_lock:
+        key = (processes, max_workers)
+        if key not in _executors:
+            if processes:
+                # Workers are not forked from the multithreaded server where
+                # a fork server is available.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else None
+                )
+                _executors[key] = ProcessPoolExecutor(max_workers, mp_context=context)
+            else:
+                _executors[key] = ThreadPoolExecutor(max_workers)
+        return _executors[key]
+
+
+def _discard_executor(processes, max_workers):
+    with _executors_lock:
+        pool = _executors.pop((processes, max_workers), None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _code_key(code):
+    """Stable description of a code object, including nested functions."""
+    parts = [code.co_code.hex(), repr(code.co_names)]
+    for const in code.co_consts:
+        parts.append(_code_key(const) if isinstance(const, types.CodeType) else repr(const))
+    return "|".join(parts)
+
+
+class AssetColumn:
+    """
+    A column whose cells are rendered from another column.
+
+    Parameters
+    ----------
+    source : str
+        Name of the DataFrame column holding the render input.
+    render : callable
+        ``render(value, *size) -> str`` producing the cell content (e.g. an
+        SVG string). It must be a module-level function of an importable
+        module to run in worker processes; otherwise threads are used.
+    size : tuple, optional
+        Extra arguments passed to `render` after the value, typically
+        ``(width, height)``. Part of the cache key.
+    cache_dir : str, optional
+        Directory of the on-disk cache. Defaults to
+        ``~/.cache/st_datatables/assets``. Pass False to disable it.
+    max_workers : int, optional
+        Size of the worker pool, defaults to the executor's default.
+    processes : bool, default True
+        Render in a process pool when `render` can be pickled by reference.
+    version : str or int, optional
+        Part of the cache key. Edits to the body of `render` already start
+        a new cache; change `version` when its output changes otherwise,
+        e.g. through a helper function or library it calls.
+    """
+
+    def __init__(
+        self, source, render, size=(), cache_dir=None, max_workers=None, processes=True,
+        version=None,
+    ):
+        self.source = source
+        self.render = render
+        self.size = tuple(size)
+        self.max_workers = max_workers
+        self.processes = processes and self._importable(render)
+        name = f"{getattr(render, '__module__', '')}.{getattr(render, '__qualname__', repr(render))}"
+        code = getattr(render, "__code__", None)
+        code_digest = _digest(_code_key(code))[:16] if code is not None else ""
+        self._namespace = f"{name}:{code_digest}:{version}"
+        if cache_dir is False:
+            self.cache_dir = None
+        else:
+            self.cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, _digest(name)[:16])
+
+    @staticmethod
+    def _importable(render):
+        if getattr(render, "__module__", "__main__") == "__main__":
+            return False
+        try:
+            pickle.dumps(render)
+        except Exception:
+            return False
+        return True
+
+    def config(self):
+        """Hashable description used in table fingerprints."""
+        return (self.source, self._namespace, self.size)
+
+    def _path(self, value):
+        key = _digest(repr((self._namespace, value, self.size)))
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    def _load(self, value):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(value), encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, value, content):
+        if self.cache_dir is None or not isinstance(content, str):
+            return
+        path = self._path(value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent sessions never read partial files.
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def render_values(self, values):
+        """
+        Render `values`, reusing cached results and rendering each distinct
+        missing value once in the worker pool.
+
+        Returns
+        -------
+        list
+            Rendered content in the order of `values`.
+        """
+        values = list(values)
+        results = {}
+        missing = []
+        for v in dict.fromkeys(values):
+            cached = self._load(v)
+            if cached is None:
+                missing.append(v)
+            else:
+                results[v] = cached
+
+        if len(missing) == 1:
+            results[missing[0]] = _call_render(self.render, missing[0], self.size)
+        elif missing:
+            pool = _executor(self.processes, self.max_workers)
+            chunksize = max(1, len(missing) // (4 * (self.max_workers or os.cpu_count() or 1)))
+            try:
+                rendered = pool.map(
+                    _call_render,
+                    [self.render] * len(missing),
+                    missing,
+                    [self.size] * len(missing),
+                    chunksize=chunksize,
+                )
+                results.update(zip(missing, rendered))
+            except BrokenProcessPool:
+                # A worker died: start a new pool next time.
+                _discard_executor(self.processes, self.max_workers)
+                raise
+        for v in missing:
+            self._store(v, results[v])
+
+        return [results[v] for v in values]
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def with_assets(df, asset_cols):
+    """
+    Return `df` with the rendered `asset_cols` inserted as leading columns.
+
+    Only the rows of `df` are rendered, so callers pass the slice they are
+    about to send (a page, the rows of a delta) rather than the full table.
+    """
+    if not asset_cols:
+        return df
+    out = df.copy()
+    for position, (name, asset) in enumerate(asset_cols.items()):
+        out.insert(position, name, asset.render_values(df[asset.source]))
+    return out
@@ -2,6 +2,7 @@ import {
   Streamlit,
   withStreamlitConnection,
   ComponentProps,
+  type ArrowTable,
 } from "streamlit-component-lib"
 import React, {
   useEffect,
@@ -14,132 +15,856 @@ import React, {
 import DataTable, { type DataTableRef } from "datatables.net-react"
 import DT from "datatables.net-dt"
 import "datatables.net-select-dt"
+import "datatables.net-scroller-dt"
 import "datatables.net-buttons/js/buttons.colVis.mjs"
 import "datatables.net-buttons/js/buttons.html5.mjs"
 
+import { actionsColumn, type ActionsConfig } from "./actions"
+import {
+  decodeRow,
+  dictionaryRenderer,
+  formatDatetime,
+  isArrowTable,
+  inflatePayload,
+  isColumnar,
+  isCompressed,
+  rankArrays,
+  rowsFromArrow,
+  rowsFromColumnar,
+  type ColumnKind,
+  type ColumnarHeader,
+  type CompressedPayload,
+  type RanksHeader,
+} from "./columnar"
+import {
+  isActive,
+  matchesRow,
+  mountFilters,
+  type FilterClause,
+  type FilterSpec,
+} from "./filters"
+import { applyDelta, TableEngine, type EngineColumn } from "./tableEngine"
+import { Telemetry, type TelemetryArgs } from "./telemetry"
 import "./MyComponent.css"
 
 DataTable.use(DT)
+// Presorted columns order on the integer ranks from Python, without the
+// numeric type's styling.
+DT.type("st-rank", { order: { pre: (d: any) => d } } as any)
 
-type ActionButton = {
-  id: string
-  className?: string
-  title?: string
-  svg?: string
-  text?: string
+type DataDelta = {
+  base: string
+  add: any[]
+  update: any[]
+  remove: any[]
 }
-type ActionsConfig = {
-  buttons: ActionButton[]
-  insertIndex?: number
-  hideWhenSelectSingle?: boolean
-  btndirection?: "horizontal" | "vertical"
+
+type LazyResponse = {
+  seq: number
+  ids: any[]
+  values: Record<string, any[]>
+}
+
+type ServerRequest = {
+  draw: number
+  start: number
+  length: number
+  order: { column: string; dir: string }[]
+  search: string
+  filters: FilterClause[]
+}
+type ServerResponse = {
+  request: ServerRequest
+  recordsTotal: number
+  recordsFiltered: number
+  data: any[]
 }
 
 type Args = {
   columns: string[]
-  data: any[]
+  data: any[] | ArrowTable | ColumnarHeader | CompressedPayload | null
+  data_buffer?: Uint8Array | null
+  column_types?: Record<string, ColumnKind>
+  dictionaries?: Record<string, any[]>
+  data_fingerprint?: string | null
+  data_delta?: DataDelta | null
+  data_total?: number | null
+  chunk?: any[] | ArrowTable | ColumnarHeader | CompressedPayload | null
+  chunk_buffer?: Uint8Array | null
+  chunk_offset?: number | null
+  presort?: boolean
+  sort_ranks?: RanksHeader | null
+  sort_buffer?: Uint8Array | null
   id_col?: string
   pageLength?: number
   lengthMenu?: number[]
   orderable?: string[]
   hidden?: string[]
   searchable?: string[]
+  filters?: FilterSpec[]
   select?: "single" | "multi" | false
   scrollX?: boolean | string
   scrollY?: boolean | string
   deferRender?: boolean
+  return_mode?: "rows" | "ids" | "indexes"
+  selection_debounce?: number
+  commit_selection?: boolean
+  virtual?: boolean
   layout?: any
   actions?: ActionsConfig | null
+  lazy?: string[]
+  lazy_response?: LazyResponse | null
+  projected?: string[]
+  projected_response?: LazyResponse | null
+  serverSide?: boolean
+  server_response?: ServerResponse | null
+  worker?: boolean
   reset_nonce?: number
+  telemetry?: TelemetryArgs | null
 }
 
+// Page/order/search/filter identity of a server-side request, ignoring
+// `draw`.
+const requestKey = (r: ServerRequest) =>
+  JSON.stringify([r.start, r.length, r.order, r.search, r.filters ?? []])
+
 function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
   const {
     columns = [],
     data = [],
+    data_buffer = null,
+    column_types = {},
+    dictionaries = {},
+    data_fingerprint = null,
+    data_delta = null,
+    data_total = null,
+    chunk = null,
+    chunk_buffer = null,
+    chunk_offset = null,
+    presort = false,
+    sort_ranks = null,
+    sort_buffer = null,
     id_col = "ID",
     pageLength = 50,
     lengthMenu = [10, 25, 50, 100],
     orderable = [],
     hidden = [],
     searchable = [],
+    filters = [],
     select = "single",
     scrollX = false,
     scrollY = false,
     deferRender = true,
+    return_mode = "rows",
+    selection_debounce = 0,
+    commit_selection = false,
+    virtual = false,
     layout = null,
     actions = null,
+    lazy = [],
+    lazy_response = null,
+    projected = [],
+    projected_response = null,
+    serverSide = false,
+    server_response = null,
+    worker = false,
     reset_nonce = 0,
+    telemetry = null,
   } = (args || {}) as Args
 
-  const dtColumns: any[] = [
-    ...columns.map((c) => ({
-      title: c,
-      data: c,
-      orderable: orderable.includes(c),
-      visible: !hidden.includes(c),
-      searchable: searchable.includes(c),
-    })),
-  ]
-  const escapeHtml = (s: string) =>
-    s.replace(
-      /[&<>"']/g,
-      (m) =>
-        ({
-          "&": "&amp;",
-          "<": "&lt;",
-          ">": "&gt;",
-          '"': "&quot;",
-          "'": "&#39;",
-        }[m] as string)
+  // The component value carries the public payload (selection or action
+  // click) plus an internal `_dt` channel that Python strips before
+  // returning, used for requests such as server-side paging.
+  const publicRef = useRef<any>({ rows: [], indexes: [], count: 0 })
+  const internalRef = useRef<Record<string, any>>({})
+  const sendValue = (value?: any) => {
+    if (value !== undefined) publicRef.current = value
+    Streamlit.setComponentValue({
+      ...publicRef.current,
+      _dt: internalRef.current,
+    })
+    telemetryRef.current?.sent()
+  }
+
+  const tableRef = useRef<DataTableRef>(null)
+
+  // Timings reported to Python with `telemetry=True`. The DataTables
+  // callbacks below are bound at initialisation and read it through the
+  // ref.
+  const telemetryRef = useRef<Telemetry | null>(null)
+  if (telemetry && !telemetryRef.current) {
+    telemetryRef.current = new Telemetry((report, rerun) => {
+      internalRef.current = { ...internalRef.current, telemetry: report }
+      if (rerun) sendValue()
+    })
+    telemetryRef.current.initStarting()
+  }
+  useEffect(() => () => telemetryRef.current?.disconnect(), [])
+
+  // Python omits `data` when the table already holds that fingerprint, or
+  // sends a `data_delta` against it. <DataTable> always gets
+  // `heldRef.current.rows`, whose identity only changes with new data, as
+  // a new array would clear and reload the table.
+  // Presorted ranks, when sent, come with the rows they index. When
+  // loading progressively, `rows` grows in place towards `total`.
+  const heldRef = useRef<{
+    fingerprint: string | null
+    rows: any[]
+    ranks: Record<string, Int32Array>
+    total: number
+  }>({
+    fingerprint: null,
+    rows: [],
+    ranks: {},
+    total: 0,
+  })
+  // Dictionary-encoded columns hold integer codes; the dictionaries are
+  // read through a ref as they may change without rebuilding the table.
+  const dictionariesRef = useRef(dictionaries)
+  dictionariesRef.current = dictionaries
+  // Values of `lazy` columns by row id, fetched for visible rows only.
+  const lazyCacheRef = useRef<Map<any, Record<string, any>>>(new Map())
+  const missing = data === null
+  // With `worker`, searching, ordering and paging run in a Web Worker and
+  // DataTables draws the page it answers, like in server-side mode.
+  const inWorker = worker && !serverSide
+  // Fingerprint of a compressed payload still being inflated.
+  const inflatingRef = useRef<string | null>(null)
+  const [, setInflated] = useState(0)
+  // A payload that fails to inflate is asked for again, once per
+  // fingerprint: the table keeps the rows it holds meanwhile.
+  const inflateFailedRef = useRef<string | null>(null)
+  const inflateFailed = (token: string, error: unknown) => {
+    console.error("st_datatables: cannot inflate the table data", error)
+    if (inflateFailedRef.current === token) return
+    inflateFailedRef.current = token
+    internalRef.current = {
+      ...internalRef.current,
+      resync: Date.now(),
+      chunk: null,
+    }
+    sendValue()
+  }
+  // Arrow and columnar transports: rows read lazily from the column
+  // vectors.
+  const buildRows = (payload: any, buffer: Uint8Array | null): any[] =>
+    isArrowTable(payload)
+      ? rowsFromArrow(
+          payload,
+          columns.filter((c) => !lazy.includes(c) && !projected.includes(c))
+        )
+      : isColumnar(payload)
+      ? rowsFromColumnar(payload, buffer)
+      : payload
+  useMemo(() => {
+    if (data === null) return
+    const parseStart = performance.now()
+    if (!serverSide) {
+      telemetryRef.current?.received(
+        telemetry,
+        Array.isArray(data) ? data.length : null,
+        data_buffer?.byteLength ?? null,
+        true
+      )
+    }
+    const hold = (payload: any, buffer: Uint8Array | null) => {
+      const built = buildRows(payload, buffer)
+      const ranks = sort_ranks ? rankArrays(sort_ranks, sort_buffer) : {}
+      heldRef.current = {
+        fingerprint: data_fingerprint,
+        rows: built,
+        ranks,
+        total: data_total ?? built.length,
+      }
+      lazyCacheRef.current.clear()
+      // Compressed payloads include their inflating.
+      telemetryRef.current?.parsed(performance.now() - parseStart, built.length)
+    }
+    if (!isCompressed(data)) {
+      inflatingRef.current = null
+      hold(data, data_buffer)
+      return
+    }
+    // Deflated payloads are inflated off the render path; the table
+    // keeps its rows until they are ready.
+    const token = data_fingerprint ?? String(Date.now())
+    inflatingRef.current = token
+    inflatePayload(data, data_buffer!)
+      .then(({ data, buffer }) => {
+        if (inflatingRef.current !== token) return
+        inflatingRef.current = null
+        hold(data, buffer)
+        setInflated((n) => n + 1)
+      })
+      .catch((error) => {
+        if (inflatingRef.current !== token) return
+        inflatingRef.current = null
+        inflateFailed(token, error)
+      })
+    // A resync resends the data under the same fingerprint.
+  }, [data_fingerprint ?? data, missing, internalRef.current.resync])
+
+  useEffect(() => {
+    const held = heldRef.current
+    if (!missing || held.fingerprint === data_fingerprint) return
+    // Omitted because we already received it: it is still being inflated.
+    if (inflatingRef.current === data_fingerprint) return
+
+    // A delta cannot be applied to a partially loaded table.
+    const complete = held.rows.length >= held.total
+    const api = complete ? tableRef.current?.dt() : undefined
+    if (api && data_delta && data_delta.base === held.fingerprint && inWorker) {
+      // The table only holds the current page: patch the held rows and
+      // redraw, which reloads them into the worker.
+      data_delta.remove.forEach((id) => lazyCacheRef.current.delete(id))
+      data_delta.update.forEach((r) => lazyCacheRef.current.delete(r[id_col]))
+      held.rows = applyDelta(held.rows, data_delta, id_col)
+      // Or the table would count as still loading the rows removed.
+      held.total = held.rows.length
+      held.fingerprint = data_fingerprint
+      api.draw(false)
+      return
+    }
+    if (api && data_delta && data_delta.base === held.fingerprint) {
+      const rowById = (id: any) => api.row("#" + id)
+      data_delta.remove.forEach((id) => {
+        lazyCacheRef.current.delete(id)
+        rowById(id).remove()
+      })
+      data_delta.update.forEach((r) => {
+        lazyCacheRef.current.delete(r[id_col])
+        const row = rowById(r[id_col])
+        if (row.any()) row.data(r)
+        else api.row.add(r)
+      })
+      if (data_delta.add.length) api.rows.add(data_delta.add)
+      api.draw(false)
+      held.fingerprint = data_fingerprint
+      return
+    }
+
+    // Omitted data we do not hold (e.g. after a remount): ask for it again.
+    internalRef.current = {
+      ...internalRef.current,
+      resync: Date.now(),
+      chunk: null,
+    }
+    sendValue()
+  }, [data_fingerprint, missing])
+
+  // Progressive loading: Python sends the first `chunk_size` rows with the
+  // data, and the following chunks one request at a time. Each chunk is
+  // appended in place (a new array would reload the table) and added to
+  // DataTables with one `rows.add()`, or in worker mode loaded into the
+  // worker with the next redraw.
+  const [loadedRows, setLoadedRows] = useState(0)
+  const held = heldRef.current
+  const loading = !serverSide && held.rows.length < held.total
+
+  useEffect(() => {
+    if (!loading) {
+      if (internalRef.current.chunk) {
+        internalRef.current = { ...internalRef.current, chunk: null }
+      }
+      return
+    }
+    internalRef.current = {
+      ...internalRef.current,
+      chunk: { fingerprint: held.fingerprint, offset: held.rows.length },
+    }
+    sendValue()
+  }, [held.rows, loadedRows, loading])
+
+  useEffect(() => {
+    if (chunk === null || chunk_offset === null) return
+    const append = (payload: any, buffer: Uint8Array | null) => {
+      const held = heldRef.current
+      // Stale or repeated answers: the rows moved on since the request.
+      if (held.fingerprint !== data_fingerprint) return
+      if (held.rows.length !== chunk_offset) return
+      const rows = buildRows(payload, buffer)
+      for (const row of rows) held.rows.push(row)
+      const api = tableRef.current?.dt()
+      // The worker reloads the rows when the redraw asks it for a page.
+      if (inWorker) api?.draw(false)
+      else api?.rows.add(rows).draw(false)
+      setLoadedRows(held.rows.length)
+    }
+    if (!isCompressed(chunk)) append(chunk, chunk_buffer)
+    else
+      inflatePayload(chunk, chunk_buffer!)
+        .then(({ data, buffer }) => append(data, buffer))
+        .catch((error) =>
+          inflateFailed(`${data_fingerprint}:${chunk_offset}`, error)
+        )
+  }, [chunk, chunk_offset, data_fingerprint])
+
+  useEffect(() => {
+    Streamlit.setFrameHeight()
+  }, [loading])
+
+  // Lazy columns are not in the payload: after each draw the ids of the
+  // visible rows without cached values are requested in one batch, and
+  // the answer is written into those rows in place.
+  // Sequence numbers start at mount time so answers to requests of an
+  // earlier mount, still in the session state, are ignored.
+  const lazySeqRef = useRef(Date.now())
+  const lazyAppliedRef = useRef(lazySeqRef.current)
+  const lazyOutstandingRef = useRef<Set<any>>(new Set())
+
+  const requestLazy = (api: any) => {
+    const cache = lazyCacheRef.current
+    const outstanding = lazyOutstandingRef.current
+    const ids = api
+      .rows({ page: "current" })
+      .data()
+      .toArray()
+      .map((r: any) => r?.[id_col])
+      .filter((id: any) => !cache.has(id) && !outstanding.has(id))
+    if (!ids.length) return
+    ids.forEach((id: any) => outstanding.add(id))
+    // Python only answers the latest request, so it repeats the ids still
+    // waiting from earlier ones.
+    lazySeqRef.current += 1
+    internalRef.current = {
+      ...internalRef.current,
+      lazy: { seq: lazySeqRef.current, ids: Array.from(outstanding) },
+    }
+    sendValue()
+  }
+
+  useEffect(() => {
+    if (!lazy_response || lazy_response.seq <= lazyAppliedRef.current) return
+    lazyAppliedRef.current = lazy_response.seq
+    const api = tableRef.current?.dt()
+    const cache = lazyCacheRef.current
+    lazy_response.ids.forEach((id, i) => {
+      const values: Record<string, any> = {}
+      for (const col in lazy_response.values) {
+        values[col] = lazy_response.values[col][i]
+      }
+      cache.set(id, values)
+      lazyOutstandingRef.current.delete(id)
+      api?.row("#" + id).invalidate("data")
+    })
+  }, [lazy_response])
+
+  // Projected columns are hidden columns left out of the payload. When
+  // one is shown, all its values are requested in one batch and kept by
+  // row id until the data changes.
+  const projectedValuesRef = useRef<Map<string, Map<any, any>>>(new Map())
+  const projectSeqRef = useRef(Date.now())
+  const projectAppliedRef = useRef(projectSeqRef.current)
+
+  const requestProjected = (api: any) => {
+    const values = projectedValuesRef.current
+    const wanted = projected.filter((c) => {
+      const column = api.column(`${c}:name`)
+      return column.any() && column.visible() && !values.has(c)
+    })
+    if (!wanted.length) return
+    projectSeqRef.current += 1
+    internalRef.current = {
+      ...internalRef.current,
+      project: { seq: projectSeqRef.current, columns: wanted },
+    }
+    sendValue()
+  }
+
+  useEffect(() => {
+    if (
+      !projected_response ||
+      projected_response.seq <= projectAppliedRef.current
     )
+      return
+    projectAppliedRef.current = projected_response.seq
+    for (const col in projected_response.values) {
+      const values = projected_response.values[col]
+      projectedValuesRef.current.set(
+        col,
+        new Map(projected_response.ids.map((id, i) => [id, values[i]]))
+      )
+    }
+    const api = tableRef.current?.dt()
+    api?.rows().invalidate("data").draw(false)
+  }, [projected_response])
+
+  // Values fetched for other data may be stale: fetch them again.
+  useEffect(() => {
+    if (!projectedValuesRef.current.size) return
+    projectedValuesRef.current.clear()
+    const api = tableRef.current?.dt()
+    if (api) requestProjected(api)
+  }, [data_fingerprint])
 
-  if (actions !== null) {
-    const rawIndex = (actions as ActionsConfig).insertIndex ?? 0
-    const insertIndex = Math.min(Math.max(rawIndex, 0), dtColumns.length)
-    const btndirection = (actions as ActionsConfig).btndirection ?? "horizontal"
-
-    const btns = (actions as ActionsConfig).buttons
-    const btnHtml = btns
-      .map((b) => {
-        const hasSvg = !!b.svg
-        const hasText = typeof b.text === "string" && b.text.trim().length > 0
-        if (!hasSvg && !hasText) return ""
-
-        const kindClass =
-          hasSvg && hasText
-            ? "icon-label-btn"
-            : hasSvg
-            ? "icon-btn"
-            : "text-btn"
-        const cls = `row-action-btn ${kindClass} ${b.className ?? ""}`.trim()
-        const titleAttr = b.title ? ` title="${escapeHtml(b.title)}"` : ""
-        const labelSpan = hasText
-          ? `<span class="btn-label">${escapeHtml(b.text!)}</span>`
-          : ""
-        const content = hasSvg
-          ? `${b.svg}${labelSpan}`
-          : labelSpan || escapeHtml(b.id)
-        const ariaLabel = escapeHtml(b.title || b.text || b.id)
-
-        return `<button class="${cls}" data-action="${b.id}" aria-label="${ariaLabel}"${titleAttr}>${content}</button>`
+  // Args arrive as fresh objects on every rerun; rebuild the column
+  // definitions (and the actions template) only when their content changes.
+  const columnsKey = JSON.stringify([
+    columns,
+    orderable,
+    hidden,
+    searchable,
+    lazy,
+    projected,
+    id_col,
+    actions,
+    column_types,
+    Object.keys(dictionaries),
+    presort,
+  ])
+  const dtColumns = useMemo(() => {
+    const defs: any[] = columns.map((c) => {
+      const format =
+        c in dictionaries
+          ? dictionaryRenderer(() => dictionariesRef.current[c])
+          : column_types[c] === "datetime"
+          ? // Epoch milliseconds sort as numbers but display and search as text.
+            (d: any, type: string) =>
+              typeof d === "number" && (type === "display" || type === "filter")
+                ? formatDatetime(d)
+                : d
+          : null
+      // Presorted columns sort on the row's rank (`meta.row` is its
+      // position in the held rows).
+      const ranked = presort && orderable.includes(c)
+      const render = ranked
+        ? (d: any, type: string, _row: any, meta: any) =>
+            type === "sort"
+              ? heldRef.current.ranks[c]?.[meta.row] ?? d
+              : format
+              ? format(d, type)
+              : d
+        : format
+      return {
+        title: c,
+        name: c,
+        data: lazy.includes(c)
+          ? (row: any) => lazyCacheRef.current.get(row?.[id_col])?.[c] ?? null
+          : projected.includes(c)
+          ? (row: any) =>
+              projectedValuesRef.current.get(c)?.get(row?.[id_col]) ?? null
+          : c,
+        ...(lazy.includes(c) || projected.includes(c)
+          ? { defaultContent: "" }
+          : {}),
+        ...(render ? { render } : {}),
+        ...(ranked ? { type: "st-rank" } : {}),
+        orderable: orderable.includes(c),
+        visible: !hidden.includes(c),
+        searchable: searchable.includes(c),
+      }
+    })
+    if (actions !== null) {
+      const rawIndex = actions.insertIndex ?? 0
+      const insertIndex = Math.min(Math.max(rawIndex, 0), defs.length)
+      defs.splice(insertIndex, 0, actionsColumn(actions))
+    }
+    return defs
+  }, [columnsKey])
+
+  // Options DataTables cannot change after initialisation form the table
+  // key: when it changes, the table is rebuilt with the rows, order,
+  // search and page it had. Page length and column visibility are applied
+  // through the API instead (see the effects below).
+  const tableKey = JSON.stringify([
+    columns,
+    orderable,
+    searchable,
+    lazy,
+    projected,
+    id_col,
+    actions,
+    select,
+    scrollX,
+    scrollY,
+    virtual,
+    deferRender,
+    layout,
+    lengthMenu,
+    serverSide,
+    inWorker,
+    presort,
+    column_types,
+    Object.keys(dictionaries),
+  ])
+  const tableKeyRef = useRef(tableKey)
+  const restoreRef = useRef<any>(null)
+  if (tableKeyRef.current !== tableKey) {
+    tableKeyRef.current = tableKey
+    telemetryRef.current?.initStarting()
+    const api = tableRef.current?.dt()
+    if (api) {
+      restoreRef.current = {
+        // Column indexes may shift, so remember ordered columns by name.
+        order: (api.order() as any[]).map((o) => [
+          api.column(o[0]).dataSrc(),
+          o[1],
+        ]),
+        search: api.search(),
+        page: api.page(),
+      }
+      // Rows may have been patched by deltas since they were received.
+      // Presorted tables never get deltas.
+      if (missing && !serverSide && !inWorker && !presort) {
+        heldRef.current.rows = api.rows().data().toArray()
+      }
+    }
+  }
+  useEffect(() => {
+    if (!lazy.length || serverSide) return
+    const api = tableRef.current?.dt()
+    if (!api) return
+    const onDraw = () => requestLazy(api)
+    api.on("draw", onDraw)
+    requestLazy(api)
+    return () => {
+      api.off("draw", onDraw)
+    }
+  }, [tableKey])
+
+  useEffect(() => {
+    if (!projected.length) return
+    const api = tableRef.current?.dt()
+    if (!api) return
+    const onVisibility = () => requestProjected(api)
+    api.on("column-visibility.dt", onVisibility)
+    requestProjected(api)
+    return () => {
+      api.off("column-visibility.dt", onVisibility)
+    }
+  }, [tableKey])
+
+  // Header filter state by column, kept when the table is rebuilt.
+  const filterStateRef = useRef<Map<string, FilterClause>>(new Map())
+  const activeClauses = () =>
+    Array.from(filterStateRef.current.values()).filter(isActive)
+  const filterCols = filters.map((f) => f.column)
+  const filtersKey = JSON.stringify(filters)
+  const columnTypesRef = useRef(column_types)
+  columnTypesRef.current = column_types
+
+  useEffect(() => {
+    const api = tableRef.current?.dt()
+    if (!api || !filters.length) return
+    const wanted = new Set(filterCols)
+    filterStateRef.current.forEach((_, c) => {
+      if (!wanted.has(c)) filterStateRef.current.delete(c)
+    })
+    // Redrawing from the first page asks Python or the worker again, or
+    // reruns the client-side search below.
+    const unmount = mountFilters(api, filters, filterStateRef.current, () =>
+      api.draw()
+    )
+    api.columns.adjust()
+    requestAnimationFrame(() => Streamlit.setFrameHeight())
+    return unmount
+  }, [tableKey, filtersKey])
+
+  // Client-side tables test their rows in a DataTables search function,
+  // registered globally, so it only answers for its own table.
+  useEffect(() => {
+    const api = tableRef.current?.dt()
+    if (!api || !filters.length || serverSide || inWorker) return
+    const node = api.table().node()
+    const test = (settings: any, _data: any, _index: number, row: any) => {
+      if (settings.nTable !== node) return true
+      const clauses = activeClauses()
+      return (
+        !clauses.length ||
+        matchesRow(row, clauses, columnTypesRef.current, dictionariesRef.current)
+      )
+    }
+    const search = (DT as any).ext.search as any[]
+    search.push(test)
+    if (activeClauses().length) api.draw(false)
+    return () => {
+      const i = search.indexOf(test)
+      if (i >= 0) search.splice(i, 1)
+    }
+  }, [tableKey, filtersKey])
+
+  const serverResponseRef = useRef<ServerResponse | null>(server_response)
+  serverResponseRef.current = server_response
+  const pendingRef = useRef<{
+    key: string
+    draw: number
+    callback: (json: any) => void
+  } | null>(null)
+
+  const answer = (
+    draw: number,
+    resp: ServerResponse,
+    callback: (json: any) => void
+  ) =>
+    callback({
+      draw,
+      recordsTotal: resp.recordsTotal,
+      recordsFiltered: resp.recordsFiltered,
+      data: resp.data,
+    })
+
+  const toRequest = (dtData: any): ServerRequest => ({
+    draw: dtData.draw,
+    start: dtData.start,
+    length: dtData.length,
+    search: dtData.search?.value ?? "",
+    filters: activeClauses(),
+    order: (dtData.order || [])
+      .map((o: any) => ({
+        column: dtData.columns?.[o.column]?.data,
+        dir: o.dir,
+      }))
+      .filter((o: any) => typeof o.column === "string"),
+  })
+
+  const ajax = (dtData: any, callback: (json: any) => void) => {
+    const request = toRequest(dtData)
+    const key = requestKey(request)
+    const resp = serverResponseRef.current
+    if (resp && requestKey(resp.request) === key) {
+      answer(request.draw, resp, callback)
+      return
+    }
+    pendingRef.current = { key, draw: request.draw, callback }
+    internalRef.current = { ...internalRef.current, request }
+    sendValue()
+  }
+
+  // The worker gets the values of the searchable, orderable and filtered
+  // columns. Lazy columns are not held: they cannot be searched or
+  // filtered there, and only ordered when presorted, on their ranks.
+  const engineRef = useRef<TableEngine | null>(null)
+  const engineColumns: EngineColumn[] = columns
+    .filter((c) =>
+      lazy.includes(c)
+        ? presort && orderable.includes(c)
+        : searchable.includes(c) || orderable.includes(c) || filterCols.includes(c)
+    )
+    .map((c) => ({
+      name: c,
+      kind: column_types[c] ?? "string",
+      searchable: searchable.includes(c) && !lazy.includes(c),
+      orderable: orderable.includes(c),
+      dictionary: dictionaries[c],
+    }))
+  const engineColumnsRef = useRef(engineColumns)
+  engineColumnsRef.current = engineColumns
+
+  const workerAjax = (dtData: any, callback: (json: any) => void) => {
+    const request = toRequest(dtData)
+    const { rows, ranks, total } = heldRef.current
+    engineRef.current ??= new TableEngine()
+    const engine = engineRef.current
+    const specs = engineColumnsRef.current
+    // Ranks index the complete table, not the first chunk of it. Chunks
+    // grow `rows` in place: its length is part of the key.
+    const complete = rows.length >= total
+    const key = `${JSON.stringify(specs)}:${rows.length}`
+    engine.sync(rows, specs, key, complete ? ranks : {})
+    engine.query(request).then((result) =>
+      callback({
+        draw: request.draw,
+        recordsTotal: result.recordsTotal,
+        recordsFiltered: result.recordsFiltered,
+        data: Array.from(result.indexes, (i) => rows[i]),
       })
-      .filter(Boolean)
-      .join("\n")
+    )
+  }
+
+  useEffect(() => () => engineRef.current?.terminate(), [])
 
-    const renderHtml = `<div class="actions-wrap ${btndirection}">${btnHtml}</div>`
+  // New data does not reach <DataTable> in worker mode: redraw, which
+  // loads it into the worker.
+  useEffect(() => {
+    if (inWorker) tableRef.current?.dt()?.draw(false)
+  }, [heldRef.current.rows])
+
+  useEffect(() => {
+    const pending = pendingRef.current
+    if (!serverSide || !pending || !server_response) return
+    if (requestKey(server_response.request) !== pending.key) return
+    pendingRef.current = null
+    telemetryRef.current?.received(
+      telemetry,
+      server_response.data.length,
+      null,
+      false,
+      true
+    )
+    answer(pending.draw, server_response, pending.callback)
+  }, [server_response])
 
-    const actionsColumn = {
-      title: "Actions",
-      data: null,
-      orderable: false,
-      className: "actions-cell",
-      render: () => renderHtml,
+  // Event handlers are bound once per table, so options that may change
+  // without rebuilding it are read through a ref.
+  const optionsRef = useRef({ return_mode, selection_debounce, commit_selection })
+  optionsRef.current = { return_mode, selection_debounce, commit_selection }
+
+  // What a selection or action click sends back: full rows, only the
+  // `id_col` values, or only the DataTables row indexes (`return_mode`).
+  const rowIdentity = (rowData: any) => {
+    const { return_mode } = optionsRef.current
+    if (return_mode === "rows") return decodeRow(rowData, dictionariesRef.current)
+    if (return_mode === "ids") return { [id_col]: rowData?.[id_col] }
+    return {}
+  }
+
+  const selectionPayload = (api: any) => {
+    const selected = api.rows({ selected: true })
+    const indexes = selected.indexes().toArray()
+    const payload: any = { indexes, count: indexes.length }
+    const { return_mode } = optionsRef.current
+    if (return_mode === "rows") {
+      payload.rows = selected
+        .data()
+        .toArray()
+        .map((r: any) => decodeRow(r, dictionariesRef.current))
+    } else if (return_mode === "ids") {
+      payload.ids = selected
+        .data()
+        .toArray()
+        .map((r: any) => r?.[id_col])
     }
-    dtColumns.splice(insertIndex, 0, actionsColumn)
+    return payload
   }
 
-  const tableRef = useRef<DataTableRef>(null)
+  // Every published selection reruns the Python script, so bursts of
+  // select/deselect events are coalesced: either debounced by
+  // `selection_debounce` ms, or held until the user commits them.
+  const selectionTimerRef = useRef<number | null>(null)
+  const [uncommitted, setUncommitted] = useState<number | null>(null)
+
+  const publishSelection = (api: any) => {
+    if (selectionTimerRef.current !== null) {
+      window.clearTimeout(selectionTimerRef.current)
+      selectionTimerRef.current = null
+    }
+    setUncommitted(null)
+    sendValue(selectionPayload(api))
+  }
+
+  const scheduleSelection = (api: any) => {
+    const { commit_selection, selection_debounce } = optionsRef.current
+    if (commit_selection) {
+      setUncommitted(api.rows({ selected: true }).count())
+      return
+    }
+    if (selection_debounce > 0) {
+      if (selectionTimerRef.current !== null) {
+        window.clearTimeout(selectionTimerRef.current)
+      }
+      selectionTimerRef.current = window.setTimeout(
+        () => publishSelection(api),
+        selection_debounce
+      )
+      return
+    }
+    publishSelection(api)
+  }
+
+  const commitSelection = () => {
+    const api = tableRef.current?.dt()
+    if (api) publishSelection(api)
+  }
 
   const [isFocused, setIsFocused] = useState(false)
 
@@ -157,47 +882,35 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
     const api = tableRef.current?.dt()
     if (!api) return
 
-    const publishSelection = () => {
-      const selected = api.rows({ selected: true })
-      const rows = selected.data().toArray()
-      const indexes = selected.indexes().toArray()
-
-      Streamlit.setComponentValue({
-        rows,
-        indexes,
-        count: rows.length,
-      })
-    }
-
     const onSelect = (e: any, dt: any, type: string, _indexes: number[]) => {
       if (type !== "row") return
-      publishSelection()
+      scheduleSelection(api)
     }
 
     const onDeselect = (e: any, dt: any, type: string, _indexes: number[]) => {
       if (type !== "row") return
-      publishSelection()
+      scheduleSelection(api)
     }
 
     api.on("select", onSelect)
     api.on("deselect", onDeselect)
 
-    publishSelection()
+    publishSelection(api)
 
     return () => {
       api.off("select", onSelect)
       api.off("deselect", onDeselect)
+      if (selectionTimerRef.current !== null) {
+        window.clearTimeout(selectionTimerRef.current)
+      }
     }
-  }, [])
+  }, [tableKey])
 
   useEffect(() => {
     const api = tableRef.current?.dt()
     if (!api) return
     api.rows().deselect()
-    const selected = api.rows({ selected: true })
-    const rows = selected.data().toArray()
-    const indexes = selected.indexes().toArray()
-    Streamlit.setComponentValue({ rows, indexes, count: rows.length })
+    publishSelection(api)
   }, [reset_nonce])
 
   useEffect(() => {
@@ -222,10 +935,8 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
       if (!tr) return
 
       const row = api.row(tr)
-      const rowData = row.data()
-
-      Streamlit.setComponentValue({
-        ...rowData,
+      sendValue({
+        ...rowIdentity(row.data()),
         action,
         _rowIndex: row.index(),
       })
@@ -235,7 +946,7 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
     return () => {
       tableNode.removeEventListener("click", handleClick)
     }
-  }, [])
+  }, [tableKey])
 
   useEffect(() => {
     const api = tableRef.current?.dt()
@@ -259,13 +970,67 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
       api.off("search.dt", adjustHeight)
       api.off("length.dt", adjustHeight as any)
     }
-  }, [])
+  }, [tableKey])
+
+  useEffect(() => {
+    const api = tableRef.current?.dt()
+    const restore = restoreRef.current
+    if (!api || !restore) return
+    restoreRef.current = null
+    const order = (restore.order as any[])
+      .filter(([name]) => orderable.includes(name))
+      .map(([name, dir]) => [dtColumns.findIndex((c) => c.name === name), dir])
+    api.order(order).search(restore.search).draw(false)
+    api.page(restore.page).draw(false)
+  }, [tableKey])
+
+  useEffect(() => {
+    const api = tableRef.current?.dt()
+    if (!api || api.page.len() === pageLength) return
+    api.page.len(pageLength).draw(false)
+  }, [pageLength, tableKey])
+
+  useEffect(() => {
+    const api = tableRef.current?.dt()
+    if (!api) return
+    let changed = false
+    columns.forEach((c) => {
+      const column = api.column(`${c}:name`)
+      const visible = !hidden.includes(c)
+      if (column.any() && column.visible() !== visible) {
+        column.visible(visible, false)
+        changed = true
+      }
+    })
+    if (changed) api.columns.adjust().draw(false)
+  }, [JSON.stringify(hidden), tableKey])
 
   return (
     <div style={{ width: "100%" }}>
+      {commit_selection && (
+        <div className="selection-commit">
+          <button
+            type="button"
+            className="selection-commit-btn"
+            disabled={uncommitted === null || disabled}
+            onClick={commitSelection}
+          >
+            {uncommitted === null
+              ? "Apply selection"
+              : `Apply selection (${uncommitted})`}
+          </button>
+        </div>
+      )}
+      {loading && (
+        <div className="progressive-loading">
+          Loading rows… {held.rows.length.toLocaleString()} /{" "}
+          {held.total.toLocaleString()}
+        </div>
+      )}
       <DataTable
+        key={tableKey}
         ref={tableRef}
-        data={data}
+        data={serverSide || inWorker ? undefined : heldRef.current.rows}
         columns={dtColumns as any}
         className="display"
         options={{
@@ -275,6 +1040,17 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
           scrollX: scrollX as any,
           scrollY: scrollY as any,
           deferRender: deferRender,
+          // Scroller keeps only the rows in (and near) the viewport in the
+          // DOM; it needs a fixed scroll height and deferred rendering.
+          ...(virtual
+            ? {
+                scroller: { loadingIndicator: true },
+                scrollY: (scrollY || "480px") as any,
+                scrollCollapse: true,
+                deferRender: true,
+              }
+            : {}),
+          rowId: id_col,
           createdRow: function (row: Node, rowData: any) {
             const idValue = rowData?.[id_col] ?? ""
             if (idValue !== "") {
@@ -282,6 +1058,19 @@ function MyComponent({ args, disabled, theme }: ComponentProps): ReactElement {
             }
           },
           ...(layout ? { layout } : {}),
+          preDrawCallback: () => {
+            telemetryRef.current?.preDraw()
+            return true
+          },
+          drawCallback: () => telemetryRef.current?.drawn(),
+          initComplete: () => telemetryRef.current?.initComplete(),
+          ...(serverSide
+            ? { serverSide: true, processing: true, order: [], ajax }
+            : {}),
+          // Keystrokes are debounced before the worker searches.
+          ...(inWorker
+            ? { serverSide: true, ajax: workerAjax, searchDelay: 200 }
+            : {}),
         }}
       ></DataTable>
     </div>
@@ -0,0 +1,120 @@
+export type ActionButton = {
+  id: string
+  className?: string
+  title?: string
+  svg?: string
+  text?: string
+}
+export type ActionsConfig = {
+  buttons: ActionButton[]
+  insertIndex?: number
+  hideWhenSelectSingle?: boolean
+  btndirection?: "horizontal" | "vertical"
+}
+
+const SVG_NS = "http://www.w3.org/2000/svg"
+const SPRITE_ID = "dt-action-sprite"
+
+const hashString = (s: string) => {
+  let h = 5381
+  for (let i = 0; i < s.length; i++) h = ((h << 5) + h + s.charCodeAt(i)) | 0
+  return (h >>> 0).toString(36)
+}
+
+const spriteSheet = (): SVGSVGElement => {
+  let sheet = document.getElementById(SPRITE_ID) as SVGSVGElement | null
+  if (!sheet) {
+    sheet = document.createElementNS(SVG_NS, "svg")
+    sheet.id = SPRITE_ID
+    sheet.setAttribute("aria-hidden", "true")
+    sheet.style.display = "none"
+    document.body.appendChild(sheet)
+  }
+  return sheet
+}
+
+/**
+ * Register an inline SVG once as a <symbol> in a hidden sprite sheet and
+ * return a small <svg><use/></svg> referencing it. Presentation attributes
+ * of the original root (fill, stroke, ...) move to the returned element,
+ * which the referenced content inherits from.
+ */
+function spriteIcon(svg: string): SVGSVGElement | null {
+  const parsed = new DOMParser().parseFromString(svg, "image/svg+xml")
+  const root = parsed.documentElement
+  if (!root || root.nodeName.toLowerCase() !== "svg") return null
+
+  const symbolId = `dt-icon-${hashString(svg)}`
+  if (!document.getElementById(symbolId)) {
+    const symbol = document.createElementNS(SVG_NS, "symbol")
+    symbol.id = symbolId
+    const viewBox = root.getAttribute("viewBox")
+    if (viewBox) symbol.setAttribute("viewBox", viewBox)
+    // Adopting moves each node out of the parsed document.
+    while (root.firstChild) symbol.appendChild(document.adoptNode(root.firstChild))
+    spriteSheet().appendChild(symbol)
+  }
+
+  const icon = document.createElementNS(SVG_NS, "svg")
+  for (const attr of Array.from(root.attributes)) {
+    if (!["xmlns", "id", "width", "height", "viewBox"].includes(attr.name)) {
+      icon.setAttribute(attr.name, attr.value)
+    }
+  }
+  icon.setAttribute("aria-hidden", "true")
+  const use = document.createElementNS(SVG_NS, "use")
+  use.setAttribute("href", `#${symbolId}`)
+  icon.appendChild(use)
+  return icon
+}
+
+/**
+ * Build the actions cell content once. The column's renderer clones this
+ * fragment for every row instead of returning an HTML string that the
+ * browser would parse again, SVGs included, for each created row.
+ */
+export function buildActionsTemplate(actions: ActionsConfig): HTMLElement {
+  const wrap = document.createElement("div")
+  wrap.className = `actions-wrap ${actions.btndirection ?? "horizontal"}`
+
+  for (const b of actions.buttons) {
+    const hasSvg = !!b.svg
+    const hasText = typeof b.text === "string" && b.text.trim().length > 0
+    if (!hasSvg && !hasText) continue
+
+    const kindClass =
+      hasSvg && hasText ? "icon-label-btn" : hasSvg ? "icon-btn" : "text-btn"
+    const btn = document.createElement("button")
+    btn.className = `row-action-btn ${kindClass} ${b.className ?? ""}`.trim()
+    btn.dataset.action = b.id
+    btn.setAttribute("aria-label", b.title || b.text || b.id)
+    if (b.title) btn.title = b.title
+
+    if (hasSvg) {
+      const icon = spriteIcon(b.svg!)
+      if (icon) btn.appendChild(icon)
+    }
+    if (hasText) {
+      const label = document.createElement("span")
+      label.className = "btn-label"
+      label.textContent = b.text!
+      btn.appendChild(label)
+    }
+    wrap.appendChild(btn)
+  }
+  return wrap
+}
+
+/** DataTables column definition for the actions column. */
+export function actionsColumn(actions: ActionsConfig) {
+  const template = buildActionsTemplate(actions)
+  return {
+    title: "Actions",
+    data: null,
+    orderable: false,
+    searchable: false,
+    className: "actions-cell",
+    render: (_data: any, type: string) =>
+      type === "display" ? template.cloneNode(true) : "",
+  }
+}
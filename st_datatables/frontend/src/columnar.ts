@@ -0,0 +1,269 @@
+import { DataType, type Vector } from "apache-arrow"
+import type { ArrowTable } from "streamlit-component-lib"
+
+/**
+ * Anything that can hand out the value of one column for a row index.
+ * Arrow vectors satisfy this directly.
+ */
+export interface ColumnVector {
+  length: number
+  get(index: number): any
+}
+
+/** Marker key holding the row index on lazily built rows. */
+const ROW_INDEX = "__i"
+
+/**
+ * Build a row class whose column properties are getters reading from the
+ * column vectors, so a row only costs one small object until a cell is
+ * actually rendered. DataTables reads `row[column]` like on plain records.
+ */
+export function makeRowClass(
+  columns: string[],
+  vectors: ColumnVector[],
+  convert: ((v: any) => any)[] = []
+) {
+  class Row {
+    [ROW_INDEX]: number
+    constructor(index: number) {
+      this[ROW_INDEX] = index
+    }
+  }
+  columns.forEach((name, j) => {
+    const vector = vectors[j]
+    const fn = convert[j]
+    Object.defineProperty(Row.prototype, name, {
+      enumerable: true,
+      get() {
+        const v = vector.get((this as unknown as Row)[ROW_INDEX])
+        return fn ? fn(v) : v
+      },
+    })
+  })
+  return Row
+}
+
+export function buildRows(
+  columns: string[],
+  vectors: ColumnVector[],
+  numRows: number,
+  convert: ((v: any) => any)[] = []
+): any[] {
+  const Row = makeRowClass(columns, vectors, convert)
+  const rows = new Array(numRows)
+  for (let i = 0; i < numRows; i++) rows[i] = new Row(i)
+  return rows
+}
+
+const toPlainValue = (v: any): any => {
+  if (v === null || v === undefined) return null
+  if (typeof v === "bigint") return Number(v)
+  if (v instanceof Date) return v.toISOString()
+  if (typeof v === "object" && typeof v.toJSON === "function") return v.toJSON()
+  return v
+}
+
+const toIsoDate = (v: any): any => {
+  if (v === null || v === undefined) return null
+  return (v instanceof Date ? v : new Date(Number(v))).toISOString()
+}
+
+/** Rows backed by the column vectors of an Arrow table sent by Python. */
+export function rowsFromArrow(arrow: ArrowTable, columns: string[]): any[] {
+  const table = arrow.table
+  const vectors = columns.map((_, j) => table.getChildAt(j) as Vector)
+  const convert = vectors.map((vec) =>
+    DataType.isTimestamp(vec.type) || DataType.isDate(vec.type)
+      ? toIsoDate
+      : toPlainValue
+  )
+  return buildRows(columns, vectors, table.numRows, convert)
+}
+
+export type ColumnKind = "number" | "datetime" | "bool" | "category" | "string"
+
+/** One column of the "columnar" transport header sent by Python. */
+export type ColumnSpec = {
+  name: string
+  kind: ColumnKind
+  dtype?: "int32" | "float64" | "uint8"
+  offset?: number
+  length?: number
+  values?: any[]
+}
+
+export type ColumnarHeader = {
+  format: "columnar"
+  rows: number
+  columns: ColumnSpec[]
+}
+
+const TYPED_ARRAYS = {
+  int32: Int32Array,
+  float64: Float64Array,
+  uint8: Uint8Array,
+}
+
+const arrayVector = (values: ArrayLike<any>): ColumnVector => ({
+  length: values.length,
+  get: (i: number) => values[i],
+})
+
+const nanToNull = (v: number) => (Number.isNaN(v) ? null : v)
+const codeOrNull = (code: number) => (code < 0 ? null : code)
+// Booleans travel as 0/1, with 2 marking a null.
+const toBool = (v: number) => (v === 2 ? null : v === 1)
+
+/**
+ * Rows backed by the typed arrays of the "columnar" transport: `buffer`
+ * holds the arrays at the offsets given in `header`, other columns carry
+ * their values in the header. Categorical codes and datetimes (epoch
+ * milliseconds) stay numbers for the column renderers to format.
+ */
+export function rowsFromColumnar(
+  header: ColumnarHeader,
+  buffer: Uint8Array | null
+): any[] {
+  // Typed array views need aligned offsets; copy if the bytes are not.
+  const bytes =
+    buffer && buffer.byteOffset % 8 !== 0 ? buffer.slice() : buffer
+  const vectors: ColumnVector[] = []
+  const convert: (((v: any) => any) | undefined)[] = []
+  header.columns.forEach((spec) => {
+    if (spec.values || !spec.dtype || !bytes) {
+      vectors.push(arrayVector(spec.values ?? []))
+      convert.push(undefined)
+      return
+    }
+    const Typed = TYPED_ARRAYS[spec.dtype]
+    vectors.push(
+      arrayVector(
+        new Typed(bytes.buffer, bytes.byteOffset + spec.offset!, spec.length!)
+      )
+    )
+    if (spec.kind === "category") {
+      convert.push(codeOrNull)
+    } else if (spec.kind === "bool") {
+      convert.push(toBool)
+    } else {
+      convert.push(spec.dtype === "float64" ? nanToNull : undefined)
+    }
+  })
+  return buildRows(
+    header.columns.map((c) => c.name),
+    vectors,
+    header.rows,
+    convert as ((v: any) => any)[]
+  )
+}
+
+export type RanksHeader = { rows: number; columns: Record<string, number> }
+
+/** Int32 rank arrays of presorted columns, by column name. */
+export function rankArrays(
+  header: RanksHeader,
+  buffer: Uint8Array | null
+): Record<string, Int32Array> {
+  if (!buffer) return {}
+  const bytes = buffer.byteOffset % 4 !== 0 ? buffer.slice() : buffer
+  const out: Record<string, Int32Array> = {}
+  for (const name in header.columns) {
+    out[name] = new Int32Array(
+      bytes.buffer,
+      bytes.byteOffset + header.columns[name],
+      header.rows
+    )
+  }
+  return out
+}
+
+/**
+ * Descriptor sent in place of `data` when the payload travels as bytes:
+ * deflated, or packed as is ("identity") by Python's shared cache.
+ */
+export type CompressedPayload = {
+  compressed: "deflate" | "identity"
+  format: "records" | "columnar"
+  size: number
+}
+
+export const isCompressed = (data: any): data is CompressedPayload =>
+  !!data &&
+  !Array.isArray(data) &&
+  (data.compressed === "deflate" || data.compressed === "identity")
+
+/**
+ * Inflate a deflated payload with a streaming `DecompressionStream` and
+ * return it as the `data` and `data_buffer` it stands for.
+ */
+export async function inflatePayload(
+  payload: CompressedPayload,
+  bytes: Uint8Array
+): Promise<{ data: any; buffer: Uint8Array | null }> {
+  const raw =
+    payload.compressed === "identity"
+      ? bytes
+      : new Uint8Array(
+          await new Response(
+            new Blob([bytes])
+              .stream()
+              .pipeThrough(new DecompressionStream("deflate"))
+          ).arrayBuffer()
+        )
+  const decoder = new TextDecoder()
+  if (payload.format === "records") {
+    return { data: JSON.parse(decoder.decode(raw)), buffer: null }
+  }
+  // Columnar: length-prefixed JSON header, then the 8-byte aligned arrays.
+  const length = new DataView(raw.buffer, raw.byteOffset, 4).getUint32(0, true)
+  const header = JSON.parse(decoder.decode(raw.subarray(4, 4 + length)))
+  const start = 4 + length + ((8 - ((4 + length) % 8)) % 8)
+  return { data: header, buffer: raw.subarray(start) }
+}
+
+export const isColumnar = (data: any): data is ColumnarHeader =>
+  !!data && !Array.isArray(data) && data.format === "columnar"
+
+/**
+ * Renderer of a dictionary-encoded column: rows hold integer codes, which
+ * follow the order of the values and are used for sorting and type
+ * detection, while display and search see the dictionary entry.
+ */
+export const dictionaryRenderer =
+  (dictionary: () => any[] | undefined) => (d: any, type: string) => {
+    if (typeof d !== "number" || type === "sort" || type === "type") return d
+    return dictionary()?.[d] ?? null
+  }
+
+/** Replace the codes of dictionary-encoded columns in `row` by values. */
+export function decodeRow(row: any, dictionaries: Record<string, any[]>): any {
+  const out = plainRow(row)
+  const names = Object.keys(dictionaries)
+  if (!names.length || !out || typeof out !== "object") return out
+  const decoded = out === row ? { ...row } : out
+  names.forEach((name) => {
+    const code = decoded[name]
+    if (typeof code === "number") decoded[name] = dictionaries[name][code] ?? null
+  })
+  return decoded
+}
+
+/** ISO text of epoch milliseconds, matching what "records" sends. */
+export const formatDatetime = (ms: number) =>
+  new Date(ms).toISOString().slice(0, 19)
+
+export const isArrowTable = (data: any): data is ArrowTable =>
+  !!data && !Array.isArray(data) && typeof data.getCell === "function"
+
+/**
+ * Copy a row into a plain object. Lazily built rows keep their values on
+ * the prototype, which neither spreading nor postMessage would carry over.
+ */
+export function plainRow(row: any): any {
+  if (!row || typeof row !== "object" || !(ROW_INDEX in row)) return row
+  const out: Record<string, any> = {}
+  for (const key in row) {
+    if (key !== ROW_INDEX) out[key] = row[key]
+  }
+  return out
+}
@@ -0,0 +1,190 @@
+/**
+ * Per-column filter widgets in the table header (`filter_cols`) and the
+ * test deciding whether a value passes a clause. Client-side tables test
+ * rows here (or in the worker); server-side tables send the clauses to
+ * Python with each request.
+ */
+import type { ColumnKind } from "./columnar"
+
+export type FilterSpec = {
+  column: string
+  type: "range" | "date" | "select" | "text"
+  min?: number | string
+  max?: number | string
+  options?: any[]
+}
+
+export type FilterClause = {
+  column: string
+  min?: number | string
+  max?: number | string
+  values?: any[]
+  text?: string
+}
+
+const DAY_MS = 86_400_000
+const INPUT_DEBOUNCE_MS = 300
+
+const blank = (v: any) => v === undefined || v === null || v === ""
+
+/** Whether a clause restricts any row. */
+export const isActive = (clause: FilterClause) =>
+  !!clause.values?.length ||
+  !!clause.text ||
+  !blank(clause.min) ||
+  !blank(clause.max)
+
+// Datetimes arrive as epoch milliseconds of their wall time or as ISO
+// strings without timezone; both are read as UTC.
+const epochMs = (v: any): number =>
+  typeof v === "number" ? v : Date.parse(/[zZ]|[+-]\d\d:?\d\d$/.test(v) ? v : `${v}Z`)
+
+/**
+ * Whether a cell value passes `clause`. Dictionary-encoded values are
+ * decoded through `dictionary`; dates in `max` include their whole day.
+ */
+export function matchesClause(
+  value: any,
+  clause: FilterClause,
+  kind: ColumnKind | undefined,
+  dictionary?: any[]
+): boolean {
+  if (dictionary && typeof value === "number") value = dictionary[value]
+  if (clause.values?.length) {
+    if (kind === "bool" && typeof value === "number") {
+      // Columnar booleans: 0, 1, and 2 for a null.
+      value = value === 2 ? null : value === 1
+    }
+    return clause.values.some((v) => v === value)
+  }
+  if (value === null || value === undefined) return false
+  if (clause.text) {
+    return String(value).toLowerCase().includes(clause.text.toLowerCase())
+  }
+  if (kind === "datetime") {
+    const t = epochMs(value)
+    if (Number.isNaN(t)) return false
+    if (!blank(clause.min) && t < Date.parse(String(clause.min))) return false
+    if (!blank(clause.max) && t >= Date.parse(String(clause.max)) + DAY_MS) {
+      return false
+    }
+    return true
+  }
+  const x = typeof value === "number" ? value : Number(value)
+  if (Number.isNaN(x)) return false
+  if (!blank(clause.min) && x < Number(clause.min)) return false
+  if (!blank(clause.max) && x > Number(clause.max)) return false
+  return true
+}
+
+/** Whether a row passes every clause. */
+export const matchesRow = (
+  row: any,
+  clauses: FilterClause[],
+  kinds: Record<string, ColumnKind>,
+  dictionaries: Record<string, any[]>
+) =>
+  clauses.every((clause) =>
+    matchesClause(
+      row?.[clause.column] ?? null,
+      clause,
+      kinds[clause.column],
+      dictionaries[clause.column]
+    )
+  )
+
+const optionLabel = (v: any) => (v === null ? "(empty)" : String(v))
+
+/**
+ * Add the widget of every spec to its column header. `clauses` holds the
+ * current state, shown in the new widgets and updated on input, after
+ * which `onChange` is called (text and number inputs are debounced).
+ * Returns a function removing the widgets.
+ */
+export function mountFilters(
+  api: any,
+  specs: FilterSpec[],
+  clauses: Map<string, FilterClause>,
+  onChange: () => void
+): () => void {
+  const nodes: HTMLElement[] = []
+  let timer: number | null = null
+  const changed = (debounce: boolean) => {
+    if (timer !== null) window.clearTimeout(timer)
+    timer = debounce ? window.setTimeout(onChange, INPUT_DEBOUNCE_MS) : null
+    if (!debounce) onChange()
+  }
+  const update = (column: string, patch: Partial<FilterClause>) => {
+    clauses.set(column, { ...(clauses.get(column) ?? { column }), ...patch })
+  }
+
+  for (const spec of specs) {
+    const column = api.column(`${spec.column}:name`)
+    if (!column.any()) continue
+    const state = clauses.get(spec.column) ?? { column: spec.column }
+    const wrap = document.createElement("div")
+    wrap.className = `column-filter column-filter-${spec.type}`
+    // Clicks and keys in the widget must not sort the column.
+    wrap.addEventListener("click", (e) => e.stopPropagation())
+    wrap.addEventListener("mousedown", (e) => e.stopPropagation())
+    wrap.addEventListener("keydown", (e) => e.stopPropagation())
+
+    if (spec.type === "range" || spec.type === "date") {
+      for (const bound of ["min", "max"] as const) {
+        const input = document.createElement("input")
+        input.type = spec.type === "date" ? "date" : "number"
+        input.placeholder = bound
+        if (spec.min !== undefined) input.min = String(spec.min)
+        if (spec.max !== undefined) input.max = String(spec.max)
+        input.value = blank(state[bound]) ? "" : String(state[bound])
+        input.addEventListener("input", () => {
+          const value =
+            input.value === ""
+              ? undefined
+              : spec.type === "date"
+              ? input.value
+              : Number(input.value)
+          update(spec.column, { [bound]: value })
+          changed(spec.type === "range")
+        })
+        wrap.appendChild(input)
+      }
+    } else if (spec.type === "select") {
+      const options = spec.options ?? []
+      const input = document.createElement("select")
+      input.multiple = true
+      input.size = Math.min(options.length, 4) || 1
+      options.forEach((v, i) => {
+        const option = document.createElement("option")
+        option.value = String(i)
+        option.textContent = optionLabel(v)
+        option.selected = !!state.values?.some((s) => s === v)
+        input.appendChild(option)
+      })
+      input.addEventListener("change", () => {
+        const values = Array.from(input.selectedOptions, (o) => options[+o.value])
+        update(spec.column, { values })
+        changed(false)
+      })
+      wrap.appendChild(input)
+    } else {
+      const input = document.createElement("input")
+      input.type = "search"
+      input.placeholder = "Filter"
+      input.value = state.text ?? ""
+      input.addEventListener("input", () => {
+        update(spec.column, { text: input.value })
+        changed(true)
+      })
+      wrap.appendChild(input)
+    }
+    const header = column.header() as HTMLElement
+    header.appendChild(wrap)
+    nodes.push(wrap)
+  }
+
+  return () => {
+    if (timer !== null) window.clearTimeout(timer)
+    nodes.forEach((node) => node.remove())
+  }
+}
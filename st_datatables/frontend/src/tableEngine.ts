@@ -0,0 +1,129 @@
+import type { ColumnKind } from "./columnar"
+import type { FilterClause } from "./filters"
+
+/** A column the worker searches, orders and/or filters on. */
+export type EngineColumn = {
+  name: string
+  kind: ColumnKind
+  searchable: boolean
+  orderable: boolean
+  dictionary?: any[]
+}
+
+export type EngineOrder = { column: string; dir: string }
+
+export type EngineQuery = {
+  search: string
+  order: EngineOrder[]
+  filters?: FilterClause[]
+  start: number
+  length: number
+}
+
+export type EngineResult = {
+  indexes: Int32Array
+  recordsTotal: number
+  recordsFiltered: number
+}
+
+export type LoadMessage = {
+  type: "load"
+  rows: number
+  columns: (EngineColumn & { values: any[] })[]
+  // Presorted ranks from Python, replacing the worker's own sort.
+  ranks: Record<string, Int32Array>
+}
+export type QueryMessage = { type: "query"; id: number } & EngineQuery
+export type ResultMessage = { id: number } & EngineResult
+
+/**
+ * Main-thread side of the table worker. It hands the searched and ordered
+ * column values to the worker once per data change and answers page
+ * requests with the indexes of the rows to draw, so searching and sorting
+ * never block the Streamlit iframe.
+ */
+export class TableEngine {
+  private worker: Worker
+  private seq = 0
+  private pending = new Map<number, (result: EngineResult) => void>()
+  private loadedRows: any[] | null = null
+  private loadedKey: string | null = null
+
+  constructor() {
+    this.worker = new Worker(new URL("./tableWorker.ts", import.meta.url), {
+      type: "module",
+    })
+    this.worker.onmessage = (e: MessageEvent<ResultMessage>) => {
+      const { id, ...result } = e.data
+      const resolve = this.pending.get(id)
+      this.pending.delete(id)
+      resolve?.(result)
+    }
+  }
+
+  /**
+   * Load `rows` into the worker unless these rows were already loaded with
+   * the same column set (`key`). Messages are processed in order, so a
+   * query sent after a load always sees the loaded data. `ranks` are the
+   * presorted ranks that came with the rows, if any.
+   */
+  sync(
+    rows: any[],
+    columns: EngineColumn[],
+    key: string,
+    ranks: Record<string, Int32Array> = {}
+  ) {
+    if (rows === this.loadedRows && key === this.loadedKey) return
+    this.loadedRows = rows
+    this.loadedKey = key
+    const message: LoadMessage = {
+      type: "load",
+      rows: rows.length,
+      columns: columns.map((c) => ({
+        ...c,
+        values: rows.map((r) => r?.[c.name] ?? null),
+      })),
+      ranks,
+    }
+    this.worker.postMessage(message)
+  }
+
+  query(query: EngineQuery): Promise<EngineResult> {
+    const id = ++this.seq
+    return new Promise((resolve) => {
+      this.pending.set(id, resolve)
+      const message: QueryMessage = { type: "query", id, ...query }
+      this.worker.postMessage(message)
+    })
+  }
+
+  terminate() {
+    this.worker.terminate()
+    this.pending.clear()
+  }
+}
+
+/**
+ * Apply a row delta to a plain array of rows keyed by `idCol`, returning a
+ * new array: removed rows are dropped, updated rows replaced in place and
+ * added rows (and updates of unknown ids) appended.
+ */
+export function applyDelta(
+  rows: any[],
+  delta: { add: any[]; update: any[]; remove: any[] },
+  idCol: string
+): any[] {
+  const removed = new Set(delta.remove)
+  const updates = new Map(delta.update.map((r) => [r[idCol], r]))
+  const out: any[] = []
+  for (const row of rows) {
+    const id = row?.[idCol]
+    if (removed.has(id)) continue
+    const update = updates.get(id)
+    if (update !== undefined) updates.delete(id)
+    out.push(update ?? row)
+  }
+  updates.forEach((r) => out.push(r))
+  for (const r of delta.add) out.push(r)
+  return out
+}
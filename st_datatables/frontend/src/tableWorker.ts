@@ -0,0 +1,207 @@
+/**
+ * Web Worker answering search/order/page requests for tables running with
+ * `worker=True`. It holds the values of the searchable, orderable and
+ * filtered columns and replies with the row indexes of the requested page; the
+ * rows themselves stay on the main thread.
+ */
+import { matchesClause, type FilterClause } from "./filters"
+import type {
+  EngineOrder,
+  LoadMessage,
+  QueryMessage,
+  ResultMessage,
+} from "./tableEngine"
+
+type Column = LoadMessage["columns"][number]
+
+let numRows = 0
+let columns = new Map<string, Column>()
+let ranks: Record<string, Int32Array> = {}
+// Lower-cased search text, built on first use per column.
+const texts = new Map<string, string[]>()
+// Row indexes in ascending order and the rank of every row, per column.
+const sorted = new Map<string, { perm: Int32Array; rank: Int32Array }>()
+// The last search, refined in place while the user keeps typing.
+let last: { search: string; matches: Int32Array } | null = null
+
+const cellText = (kind: string, v: any): string => {
+  if (v === null || v === undefined) return ""
+  if (kind === "datetime" && typeof v === "number") {
+    return new Date(v).toISOString().slice(0, 19).toLowerCase()
+  }
+  return String(v).toLowerCase()
+}
+
+function searchText(col: Column): string[] {
+  let text = texts.get(col.name)
+  if (!text) {
+    const source = col.dictionary ?? col.values
+    text = source.map((v) => cellText(col.kind, v))
+    texts.set(col.name, text)
+  }
+  return text
+}
+
+/** Keep the `candidates` (all rows if null) containing `term` in a column. */
+function matchTerm(term: string, candidates: Int32Array | null): Int32Array {
+  // Dictionary columns are matched once per entry, then by code.
+  const tests = Array.from(columns.values())
+    .filter((c) => c.searchable)
+    .map((col) => {
+      const text = searchText(col)
+      if (!col.dictionary) return (i: number) => text[i].includes(term)
+      const hit = text.map((t) => t.includes(term))
+      const codes = col.values
+      return (i: number) => codes[i] !== null && hit[codes[i]]
+    })
+  const count = candidates ? candidates.length : numRows
+  const out = new Int32Array(count)
+  let n = 0
+  for (let k = 0; k < count; k++) {
+    const i = candidates ? candidates[k] : k
+    if (tests.some((test) => test(i))) out[n++] = i
+  }
+  return out.slice(0, n)
+}
+
+/**
+ * Rows matching a DataTables "smart" search: every whitespace separated
+ * term must appear in one of the searchable columns. A search extending
+ * the previous one only rescans the previous matches.
+ */
+function search(value: string): Int32Array | null {
+  const query = value.toLowerCase()
+  const terms = query.split(/\s+/).filter(Boolean)
+  if (!terms.length) {
+    last = null
+    return null
+  }
+  let matches = last && query.startsWith(last.search) ? last.matches : null
+  for (const term of terms) matches = matchTerm(term, matches)
+  last = { search: query, matches: matches! }
+  return matches
+}
+
+/** Keep the `matches` (all rows if null) passing every column filter. */
+function filterRows(
+  matches: Int32Array | null,
+  clauses: FilterClause[]
+): Int32Array | null {
+  const tests = clauses
+    .filter((clause) => columns.has(clause.column))
+    .map((clause) => {
+      const col = columns.get(clause.column)!
+      return (i: number) =>
+        matchesClause(col.values[i], clause, col.kind, col.dictionary)
+    })
+  if (!tests.length) return matches
+  const count = matches ? matches.length : numRows
+  const out = new Int32Array(count)
+  let n = 0
+  for (let k = 0; k < count; k++) {
+    const i = matches ? matches[k] : k
+    if (tests.every((test) => test(i))) out[n++] = i
+  }
+  return out.slice(0, n)
+}
+
+const compareValues = (a: any, b: any): number => {
+  if (a === b) return 0
+  // Empty cells last, numbers before text.
+  if (a === null) return 1
+  if (b === null) return -1
+  if (typeof a === "number" && typeof b === "number") return a - b
+  if (typeof a === "number") return -1
+  if (typeof b === "number") return 1
+  const x = String(a).toLowerCase()
+  const y = String(b).toLowerCase()
+  return x < y ? -1 : x > y ? 1 : 0
+}
+
+function sortedColumn(col: Column) {
+  let entry = sorted.get(col.name)
+  if (!entry && ranks[col.name]) {
+    // Presorted: a run of equal values starts at its rank, so the order
+    // follows from one counting pass.
+    const rank = ranks[col.name]
+    const perm = new Int32Array(numRows)
+    const filled = new Int32Array(numRows)
+    for (let i = 0; i < numRows; i++) perm[rank[i] + filled[rank[i]]++] = i
+    entry = { perm, rank }
+    sorted.set(col.name, entry)
+  }
+  if (!entry) {
+    const values = col.values
+    const perm = Int32Array.from({ length: numRows }, (_, i) => i)
+    perm.sort((a, b) => compareValues(values[a], values[b]) || a - b)
+    // Equal values share a rank so later order columns can break ties.
+    const rank = new Int32Array(numRows)
+    for (let k = 1; k < numRows; k++) {
+      const same = compareValues(values[perm[k]], values[perm[k - 1]]) === 0
+      rank[perm[k]] = same ? rank[perm[k - 1]] : k
+    }
+    entry = { perm, rank }
+    sorted.set(col.name, entry)
+  }
+  return entry
+}
+
+function orderRows(matches: Int32Array | null, order: EngineOrder[]): Int32Array {
+  const cols = order
+    .map((o) => ({ col: columns.get(o.column), desc: o.dir === "desc" }))
+    .filter((o) => o.col?.orderable)
+  if (!cols.length) {
+    return matches ?? Int32Array.from({ length: numRows }, (_, i) => i)
+  }
+  if (cols.length === 1) {
+    // Walk the presorted permutation, keeping the matching rows.
+    const { perm } = sortedColumn(cols[0].col!)
+    const keep = matches ? new Uint8Array(numRows) : null
+    if (keep) matches!.forEach((i) => (keep[i] = 1))
+    const out = new Int32Array(matches ? matches.length : numRows)
+    let n = 0
+    for (let k = 0; k < numRows; k++) {
+      const i = perm[cols[0].desc ? numRows - 1 - k : k]
+      if (!keep || keep[i]) out[n++] = i
+    }
+    return out
+  }
+  const ranks = cols.map((o) => ({
+    rank: sortedColumn(o.col!).rank,
+    sign: o.desc ? -1 : 1,
+  }))
+  const rows = matches
+    ? Int32Array.from(matches)
+    : Int32Array.from({ length: numRows }, (_, i) => i)
+  return rows.sort((a, b) => {
+    for (const { rank, sign } of ranks) {
+      const d = rank[a] - rank[b]
+      if (d) return sign * d
+    }
+    return a - b
+  })
+}
+
+self.onmessage = (e: MessageEvent<LoadMessage | QueryMessage>) => {
+  const message = e.data
+  if (message.type === "load") {
+    numRows = message.rows
+    columns = new Map(message.columns.map((c) => [c.name, c]))
+    ranks = message.ranks
+    texts.clear()
+    sorted.clear()
+    last = null
+    return
+  }
+  const matches = filterRows(search(message.search), message.filters ?? [])
+  const rows = orderRows(matches, message.order)
+  const end = message.length < 0 ? rows.length : message.start + message.length
+  const indexes = rows.slice(message.start, end)
+  const result: ResultMessage = {
+    id: message.id,
+    indexes,
+    recordsTotal: numRows,
+    recordsFiltered: rows.length,
+  }
+  self.postMessage(result, { transfer: [indexes.buffer] })
+}
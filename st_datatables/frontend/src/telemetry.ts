@@ -0,0 +1,187 @@
+/**
+ * Client-side timings of a table (`telemetry=True`): how long the data took
+ * to arrive, to parse, to initialise DataTables and to draw. Reports go
+ * back to Python through the internal `_dt` channel: only the first draw
+ * of new data reruns the script to deliver its report, later draws are
+ * held until the component value next changes.
+ */
+
+/** Timing arguments Python sends with every rerun. */
+export type TelemetryArgs = {
+  // Python time spent preparing the args, in milliseconds.
+  prepare_ms: number
+  // Python wall clock (epoch milliseconds) when the args were sent.
+  sent_at: number
+}
+
+export type TelemetryReport = {
+  seq: number
+  rows: number | null
+  payload_bytes: number | null
+  prepare_ms: number | null
+  transfer_ms: number | null
+  parse_ms: number | null
+  init_ms: number | null
+  first_draw_ms: number | null
+  draw_ms: number[]
+  long_task_ms: number
+}
+
+const DRAW_MEASURE = "st-datatables-draw"
+const MAX_DRAWS = 50
+
+const round = (ms: number) => Math.round(ms * 10) / 10
+
+/**
+ * Collects the timings of the data received last and of the draws since
+ * the previous report, and calls `send` with the report after every draw.
+ * `rerun` is only set for the first draw of data sent by Python (or of
+ * the first server-side page of a table); other reports are meant to
+ * ride along with the next component value, after which `sent()` starts
+ * the next report.
+ */
+export class Telemetry {
+  private seq = Date.now()
+  private pending: Partial<TelemetryReport> | null = null
+  // Whether the first draw of the pending data reruns the script.
+  private pendingReruns = false
+  private firstPage = true
+  private receivedAt = 0
+  // The received rows are not built yet: draws until then show old data.
+  private parsing = false
+  private initStart: number | null = null
+  private initMs: number | null = null
+  private drawStart: number | null = null
+  private draws: number[] = []
+  private longTaskMs = 0
+  // What the last report covered, until a component value carries it.
+  private reported: {
+    pending: Partial<TelemetryReport> | null
+    initMs: number | null
+    draws: number
+    longTaskMs: number
+  } | null = null
+  private flushTimer: number | null = null
+  private observer: PerformanceObserver | null = null
+
+  constructor(private send: (report: TelemetryReport, rerun: boolean) => void) {
+    // Main-thread tasks over 50 ms (Chromium), e.g. building rows.
+    if (PerformanceObserver.supportedEntryTypes?.includes("longtask")) {
+      this.observer = new PerformanceObserver((list) =>
+        list.getEntries().forEach((entry) => (this.longTaskMs += entry.duration))
+      )
+      this.observer.observe({ type: "longtask" })
+    }
+  }
+
+  /**
+   * New data (or, with `page`, a server-side page) arrived with these
+   * Python timings; with `parses`, `parsed` is called once its rows are
+   * built.
+   */
+  received(
+    args: TelemetryArgs | null,
+    rows: number | null,
+    bytes: number | null,
+    parses = false,
+    page = false
+  ) {
+    this.receivedAt = performance.now()
+    this.parsing = parses
+    // A page follows a request, which already reran the script.
+    this.pendingReruns = !page || this.firstPage
+    if (page) this.firstPage = false
+    this.pending = {
+      rows,
+      payload_bytes: bytes,
+      prepare_ms: args ? round(args.prepare_ms) : null,
+      transfer_ms: args ? round(Math.max(0, Date.now() - args.sent_at)) : null,
+    }
+  }
+
+  /** Time spent turning the received payload into rows. */
+  parsed(ms: number, rows: number) {
+    if (!this.pending) return
+    this.pending.parse_ms = round(ms)
+    this.pending.rows = rows
+    this.parsing = false
+  }
+
+  /** The table is about to be (re)built. */
+  initStarting() {
+    this.initStart = performance.now()
+    this.firstPage = true
+  }
+
+  initComplete() {
+    if (this.initStart === null) return
+    this.initMs = round(performance.now() - this.initStart)
+    this.initStart = null
+  }
+
+  preDraw() {
+    this.drawStart = performance.now()
+    performance.mark(DRAW_MEASURE)
+  }
+
+  drawn() {
+    if (this.drawStart === null) return
+    // Also visible in the browser's performance timeline.
+    performance.measure(DRAW_MEASURE, DRAW_MEASURE)
+    performance.clearMarks(DRAW_MEASURE)
+    this.draws.push(round(performance.now() - this.drawStart))
+    if (this.draws.length > MAX_DRAWS) this.draws.shift()
+    this.drawStart = null
+    if (this.pending && !this.parsing && this.pending.first_draw_ms == null) {
+      this.pending.first_draw_ms = round(performance.now() - this.receivedAt)
+      // DataTables completes its initialisation after the first draw.
+      const rerun = this.pendingReruns
+      this.flushTimer = window.setTimeout(() => this.flush(rerun), 0)
+    } else if (this.flushTimer === null) {
+      this.flush(false)
+    }
+  }
+
+  private flush(rerun: boolean) {
+    this.flushTimer = null
+    // Data still to be drawn is left for its own report.
+    const pending = this.pending?.first_draw_ms != null ? this.pending : null
+    if (!pending && !this.draws.length) return
+    const report: TelemetryReport = {
+      rows: null,
+      payload_bytes: null,
+      prepare_ms: null,
+      transfer_ms: null,
+      parse_ms: null,
+      first_draw_ms: null,
+      ...pending,
+      seq: ++this.seq,
+      init_ms: this.initMs,
+      draw_ms: this.draws.slice(),
+      long_task_ms: round(this.longTaskMs),
+    }
+    this.reported = {
+      pending,
+      initMs: this.initMs,
+      draws: this.draws.length,
+      longTaskMs: this.longTaskMs,
+    }
+    this.send(report, rerun)
+  }
+
+  /** A component value carried the last report: start the next one. */
+  sent() {
+    const reported = this.reported
+    if (!reported) return
+    this.reported = null
+    if (reported.pending && this.pending === reported.pending) this.pending = null
+    if (this.initMs === reported.initMs) this.initMs = null
+    this.draws = this.draws.slice(reported.draws)
+    this.longTaskMs = Math.max(0, this.longTaskMs - reported.longTaskMs)
+  }
+
+  disconnect() {
+    if (this.flushTimer !== null) window.clearTimeout(this.flushTimer)
+    this.observer?.disconnect()
+  }
+}
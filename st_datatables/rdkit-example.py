@@ -1,15 +1,14 @@
 import streamlit as st
-from st_datatables import st_datatables
+from st_datatables import st_datatables, AssetColumn
 import json
 import pandas as pd
 import os
-import time
 
-from rdkit import Chem
-from rdkit.Chem import AllChem
-from rdkit.Chem.Draw import rdMolDraw2D
 from rdkit.Chem import Draw as RDDraw
 
+# Importable (not defined in this script) so it renders in a process pool.
+from rdkit_assets import smiles_to_svg
+
 st.set_page_config(layout="wide")
 from streamlit.components.v1 import html
 import streamlit.components.v1 as components
@@ -73,32 +72,8 @@ def normalize(v):
         return None
     return json.dumps(v, sort_keys=True, ensure_ascii=False)
 
-def smiles_to_svg(smiles: str, w: int = 110, h: int = 80) -> str:
-    if not smiles or Chem is None:
-        return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
-    try:
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
-            return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
-        AllChem.Compute2DCoords(mol)
-        drawer = rdMolDraw2D.MolDraw2DSVG(w, h)
-        drawer.DrawMolecule(mol)
-        drawer.FinishDrawing()
-        svg = drawer.GetDrawingText()
-        return svg
-    except Exception:
-        return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
-
-@st.cache_data(show_spinner=False)
-def build_df_with_assets(df: pd.DataFrame, w: int = 110, h: int = 80) -> pd.DataFrame:
-    start = time.time()
-    svg_list: list[str] = []
-    for smi in df["SMILES"].astype(str).fillna(""):
-        svg_list.append(smiles_to_svg(smi, w=w, h=h))
-    out = df.copy()
-    out.insert(0, "structure_svg", svg_list)
-    print(time.time()-start)
-    return out
+# Rendered in a worker pool with an on-disk cache, only for the rows sent.
+structure_svg = AssetColumn("SMILES", smiles_to_svg, size=(200, 200))
 
 state_key = "table1_prev"
 if state_key not in st.session_state:
@@ -112,13 +87,12 @@ if state_key not in st.session_state:
 df = pd.read_csv("./st_datatables/frontend/public/smiles1000.csv")
 
 # df.drop(["PATTERN_FP","CANONICAL_SMILES"], axis=1, inplace=True)
-df_with_assets = build_df_with_assets(df.iloc[:100,:], w=200, h=200)
 
 
 # st.dataframe(df)
 # # selected_row = my_component("World")
 selected = st_datatables(
-    df=df_with_assets, 
+    df=df, 
     pageLength=25, 
     lengthMenu=[10,25,100],
     orderable_cols=["MOLWT","NUM_ATOMS"],
@@ -126,12 +100,14 @@ selected = st_datatables(
     searchable_cols=["SMIES","INCHI","NUM_ATOMS"],
     select="single",
     scrollX=False,
-    scrollY=False,
+    scrollY="600px",
     deferRender=True,
+    virtual=True,
     layout= {
         "top1End": {"buttons": ["colvis"],},
         },
     actions=actions,
+    asset_cols={"structure_svg": structure_svg},
     key="table1"
     )
 
@@ -0,0 +1,28 @@
+"""
+Structure drawings for `rdkit-example.py`.
+
+Kept out of the Streamlit script so that `AssetColumn` can pickle the
+render function by reference and draw in its process pool: functions
+defined in the script (``__main__``) are drawn in a thread pool instead.
+"""
+
+from rdkit import Chem
+from rdkit.Chem import AllChem
+from rdkit.Chem.Draw import rdMolDraw2D
+
+
+def smiles_to_svg(smiles: str, w: int = 110, h: int = 80) -> str:
+    if not smiles or Chem is None:
+        return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
+    try:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
+        AllChem.Compute2DCoords(mol)
+        drawer = rdMolDraw2D.MolDraw2DSVG(w, h)
+        drawer.DrawMolecule(mol)
+        drawer.FinishDrawing()
+        svg = drawer.GetDrawingText()
+        return svg
+    except Exception:
+        return f"<svg width=\"{w}\" height=\"{h}\"></svg>"
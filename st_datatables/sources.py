@@ -0,0 +1,503 @@
+"""File-backed table sources for server-side mode.
+
+A `TableSource` stands in for the DataFrame of a ``serverSide=True``
+table when the data does not fit (or should not be copied) into every
+session's memory. It answers the search, order and page of a DataTables
+request itself, and only the rows of the requested page are ever
+materialized as a DataFrame:
+
+- `ArrowSource` reads Parquet or Arrow IPC/Feather files through
+  memory-mapped pyarrow datasets; searching and ordering scan only the
+  searchable/ordered columns, batch by batch.
+- `SQLiteSource` and `DuckDBSource` translate the request into one SQL
+  query with ``WHERE``/``ORDER BY``/``LIMIT`` on a database file or, for
+  DuckDB, on a relation (e.g. ``duckdb.read_parquet(...)``).
+- `PolarsSource` turns it into ``filter``/``sort``/``slice`` on a Polars
+  ``LazyFrame``, so only the page is collected.
+
+Sources are read-only and safe to share between sessions, e.g. created
+once with ``st.cache_resource``. `as_source` wraps Polars frames and DuckDB
+relations passed to `st_datatables()` directly.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ._cache import LRUCache
+from ._filters import clause_mask
+
+# Searches and sort orders remembered per source.
+SOURCE_CACHE_ENTRIES = 8
+
+
+class TableSource:
+    """
+    Rows read on demand, answering server-side requests.
+
+    Subclasses set `columns` and implement `__len__`, `head` and `query`.
+    """
+
+    columns = []
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def head(self, n=5):
+        """The first `n` rows as a DataFrame (used for column types)."""
+        raise NotImplementedError
+
+    def query(self, search, searchable_cols, order, start, length, filters=()):
+        """
+        Rows `start` to ``start + length`` (all if `length` is negative)
+        of the rows matching a DataTables "smart" `search` over
+        `searchable_cols` and passing the column `filters` (clauses as
+        described in `st_datatables._filters`), in `order`
+        (``[{"column", "dir"}]``).
+
+        Returns
+        -------
+        tuple
+            ``(page, filtered)``: the page as a DataFrame and the number of
+            rows matching the search.
+        """
+        raise NotImplementedError
+
+
+def _terms(search):
+    return str(search or "").lower().split()
+
+
+def _clauses_key(filters):
+    return json.dumps(list(filters), sort_keys=True, default=str)
+
+
+def _day_after(date):
+    """``YYYY-MM-DD`` of the day after `date`: date ranges include their last day."""
+    return (pd.Timestamp(date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+class ArrowSource(TableSource):
+    """
+    A Parquet or Arrow IPC/Feather file (or directory of files), read
+    through a memory-mapped pyarrow dataset.
+
+    Searching reads the searchable columns batch by batch; ordering reads
+    the ordered columns once per sort order and keeps the permutation.
+    The page is then taken by row position, which only touches the row
+    groups (or record batches) holding it.
+
+    Parameters
+    ----------
+    path : str
+    format : {"parquet", "ipc", "feather"}, optional
+        Inferred from the file extension by default (Parquet for
+        ``.parquet``/``.pq``, Arrow IPC otherwise).
+    columns : list[str], optional
+        Columns to show, all by default.
+    """
+
+    def __init__(self, path, format=None, columns=None):
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        if format is None:
+            format = "parquet" if os.path.splitext(str(path))[1] in (".parquet", ".pq") else "ipc"
+        self._dataset = ds.dataset(
+            path, format=format, filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+        self.columns = list(columns or self._dataset.schema.names)
+        self._rows = None
+        self._lock = threading.Lock()
+        self._matches = LRUCache(SOURCE_CACHE_ENTRIES)
+        self._orders = LRUCache(SOURCE_CACHE_ENTRIES)
+
+    def __len__(self):
+        if self._rows is None:
+            self._rows = self._dataset.count_rows()
+        return self._rows
+
+    def head(self, n=5):
+        return self._dataset.head(n, columns=self.columns).to_pandas()
+
+    def _search(self, terms, cols, filters=()):
+        """Sorted positions of the rows containing every term and passing `filters`."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        key = (tuple(terms), tuple(cols), _clauses_key(filters))
+        with self._lock:
+            cached = self._matches.get(key)
+        if cached is not None:
+            return cached
+        found = []
+        offset = 0
+        read = list(dict.fromkeys(list(cols) + [c["column"] for c in filters]))
+        for batch in self._dataset.to_batches(columns=read):
+            texts = [pc.cast(batch.column(c), pa.string()) for c in cols]
+            keep = np.ones(batch.num_rows, dtype=bool)
+            for clause in filters:
+                keep &= clause_mask(batch.column(clause["column"]).to_pandas(), clause)
+            for term in terms:
+                hit = np.zeros(batch.num_rows, dtype=bool)
+                for text in texts:
+                    match = pc.match_substring(text, term, ignore_case=True)
+                    hit |= pc.fill_null(match, False).to_numpy(zero_copy_only=False)
+                keep &= hit
+            found.append(np.flatnonzero(keep) + offset)
+            offset += batch.num_rows
+        positions = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        with self._lock:
+            self._matches.put(key, positions)
+        return positions
+
+    def _permutation(self, order):
+        """Row positions in `order`, empty cells last."""
+        import pyarrow.compute as pc
+
+        key = tuple((o["column"], o.get("dir", "asc")) for o in order)
+        with self._lock:
+            cached = self._orders.get(key)
+        if cached is not None:
+            return cached
+        table = self._dataset.to_table(columns=list(dict.fromkeys(c for c, _ in key)))
+        sort_keys = [(c, "descending" if d == "desc" else "ascending") for c, d in key]
+        try:
+            # Newer pyarrow takes the null placement per sort key.
+            perm = pc.sort_indices(table, sort_keys=[k + ("at_end",) for k in sort_keys])
+        except (TypeError, ValueError):
+            perm = pc.sort_indices(table, sort_keys=sort_keys, null_placement="at_end")
+        perm = perm.to_numpy()
+        with self._lock:
+            self._orders.put(key, perm)
+        return perm
+
+    def query(self, search, searchable_cols, order, start, length, filters=()):
+        terms = _terms(search)
+        cols = [c for c in searchable_cols if c in self.columns] if terms else []
+        matches = None
+        if terms and not cols:
+            matches = np.empty(0, dtype=np.int64)
+        elif terms or filters:
+            matches = self._search(terms, cols, filters)
+        if order:
+            rows = self._permutation(order)
+            if matches is not None:
+                rows = rows[np.isin(rows, matches, assume_unique=True)]
+        else:
+            rows = matches if matches is not None else None
+        filtered = len(self) if rows is None else len(rows)
+        end = filtered if length < 0 else min(start + length, filtered)
+        if rows is None:
+            positions = np.arange(start, max(end, start))
+        else:
+            positions = rows[start:end]
+        page = self._dataset.take(positions, columns=self.columns).to_pandas()
+        return page, filtered
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SQLSource(TableSource):
+    """
+    A table or query of a SQL database, answered with one SQL query per
+    request. Subclasses provide the connection.
+
+    Parameters
+    ----------
+    table : str, optional
+        Name of the table or view to show.
+    query : str, optional
+        A ``SELECT`` statement to show instead of `table`.
+    """
+
+    # Clause allowing an OFFSET without a row limit.
+    _unlimited = ""
+
+    def __init__(self, table=None, query=None):
+        if (table is None) == (query is None):
+            raise ValueError("Pass exactly one of `table` and `query`")
+        self._from = _quote(table) if table is not None else f"({query}) AS _source"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts = LRUCache(SOURCE_CACHE_ENTRIES)
+        self.columns = list(self._read(f"SELECT * FROM {self._from} LIMIT 0").columns)
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _connection(self):
+        # Connections are not shared between the threads of sessions.
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = self._connect()
+        return self._local.connection
+
+    def _read(self, sql, params=()):
+        """Run `sql` and return the result as a DataFrame."""
+        return pd.read_sql_query(sql, self._connection(), params=list(params))
+
+    def _param(self, value, params):
+        """Placeholder for `value` in a statement, collecting it in `params`."""
+        params.append(value)
+        return "?"
+
+    def _contains(self, col, text, params):
+        """SQL condition of column `col` containing `text`, ignoring case."""
+        escaped = text.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = self._param(f"%{escaped}%", params)
+        return f"lower(CAST({_quote(col)} AS TEXT)) LIKE {pattern} ESCAPE '\\'"
+
+    def _filter(self, clause, params):
+        """SQL condition of a column filter clause."""
+        col = _quote(clause["column"])
+        if clause.get("values"):
+            values = ", ".join(self._param(v, params) for v in clause["values"])
+            return f"{col} IN ({values})"
+        if clause.get("text"):
+            return self._contains(clause["column"], str(clause["text"]), params)
+        conditions = []
+        lo, hi = clause.get("min"), clause.get("max")
+        if lo not in (None, ""):
+            conditions.append(f"{col} >= {self._param(lo, params)}")
+        if isinstance(hi, str) and hi:
+            conditions.append(f"{col} < {self._param(_day_after(hi), params)}")
+        elif hi not in (None, ""):
+            conditions.append(f"{col} <= {self._param(hi, params)}")
+        return " AND ".join(conditions)
+
+    def _where(self, search, searchable_cols, filters=()):
+        terms = _terms(search)
+        cols = [c for c in searchable_cols if c in self.columns]
+        if terms and not cols:
+            return " WHERE 1 = 0", []
+        clauses, params = [], []
+        for clause in filters:
+            clauses.append(self._filter(clause, params))
+        for term in terms:
+            clauses.append("(" + " OR ".join(self._contains(c, term, params) for c in cols) + ")")
+        if not clauses:
+            return "", []
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _count(self, where, params):
+        key = (where, tuple(params))
+        with self._lock:
+            count = self._counts.get(key)
+        if count is None:
+            count = int(self._read(f"SELECT COUNT(*) FROM {self._from}{where}", params).iloc[0, 0])
+            with self._lock:
+                self._counts.put(key, count)
+        return count
+
+    def __len__(self):
+        return self._count("", [])
+
+    def head(self, n=5):
+        return self._read(f"SELECT * FROM {self._from} LIMIT {int(n)}")
+
+    def query(self, search, searchable_cols, order, start, length, filters=()):
+        where, params = self._where(search, searchable_cols, filters)
+        sql = f"SELECT * FROM {self._from}{where}"
+        if order:
+            sql += " ORDER BY " + ", ".join(
+                f"{_quote(o['column'])} {'DESC' if o.get('dir') == 'desc' else 'ASC'} NULLS LAST"
+                for o in order
+            )
+        if length >= 0:
+            sql += f" LIMIT {int(length)} OFFSET {int(start)}"
+        elif start:
+            sql += f"{self._unlimited} OFFSET {int(start)}"
+        page = self._read(sql, params)
+        return page, self._count(where, params)
+
+
+class SQLiteSource(SQLSource):
+    """
+    A table or query of a SQLite database file, opened read-only.
+
+    Parameters
+    ----------
+    path : str
+    table, query : str, optional
+        See `SQLSource`.
+    """
+
+    _unlimited = " LIMIT -1"
+
+    def __init__(self, path, table=None, query=None):
+        self.path = os.fspath(path)
+        super().__init__(table, query)
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+
+class DuckDBSource(SQLSource):
+    """
+    A table or query of a DuckDB database file, opened read-only, or a
+    DuckDB relation. A `query` may also read files directly, e.g.
+    ``"SELECT * FROM 'results/*.parquet'"``. Requires the ``duckdb``
+    package.
+
+    Parameters
+    ----------
+    path : str, optional
+        Database file; an in-memory database by default.
+    table, query : str, optional
+        See `SQLSource`.
+    relation : duckdb.DuckDBPyRelation, optional
+        A relation to show instead, e.g. ``duckdb.read_parquet(path)``.
+        Requests run on the relation's own connection, one at a time.
+    """
+
+    def __init__(self, path=None, table=None, query=None, relation=None):
+        self.path = os.fspath(path) if path is not None else None
+        self._relation = relation
+        if relation is not None:
+            if table is not None or query is not None:
+                raise ValueError("Pass either `relation` or `table`/`query`")
+            self._relation_lock = threading.Lock()
+            table = "_source"
+        super().__init__(table, query)
+
+    def _connect(self):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("DuckDBSource requires the `duckdb` package") from e
+        if self.path is None:
+            return duckdb.connect()
+        return duckdb.connect(self.path, read_only=True)
+
+    def _read(self, sql, params=()):
+        if self._relation is not None:
+            # Parameters are inlined as literals (see `_param`).
+            with self._relation_lock:
+                return self._relation.query("_source", sql).df()
+        return self._connection().execute(sql, list(params)).df()
+
+    def _param(self, value, params):
+        if self._relation is None:
+            return super()._param(value, params)
+        # Relation queries take no parameters: inline a quoted literal.
+        return "'" + str(value).replace("'", "''") + "'"
+
+
+class PolarsSource(TableSource):
+    """
+    A Polars ``LazyFrame`` (or ``DataFrame``), e.g. from
+    ``pl.scan_parquet(path)``. Search, order and page become ``filter``,
+    ``sort`` and ``slice`` on the lazy query, which Polars pushes down to
+    the scan, and only the page is collected. Requires the ``polars``
+    package.
+
+    Parameters
+    ----------
+    frame : polars.LazyFrame or polars.DataFrame
+    """
+
+    def __init__(self, frame):
+        self._frame = frame.lazy()
+        try:
+            self.columns = list(self._frame.collect_schema().names())
+        except AttributeError:
+            self.columns = list(self._frame.columns)
+        self._lock = threading.Lock()
+        self._counts = LRUCache(SOURCE_CACHE_ENTRIES)
+
+    @staticmethod
+    def _filter(clause):
+        """Polars expression of a column filter clause."""
+        import polars as pl
+
+        col = pl.col(clause["column"])
+        if clause.get("values"):
+            return col.is_in(clause["values"])
+        if clause.get("text"):
+            text = str(clause["text"]).lower()
+            return col.cast(pl.Utf8).str.to_lowercase().str.contains(text, literal=True)
+        lo, hi = clause.get("min"), clause.get("max")
+        conditions = []
+        if isinstance(lo, str) or isinstance(hi, str):
+            # Date ranges compare calendar days, the last one included.
+            day = col.dt.date()
+            if lo:
+                conditions.append(day >= datetime.date.fromisoformat(lo))
+            if hi:
+                conditions.append(day <= datetime.date.fromisoformat(hi))
+        else:
+            if lo is not None:
+                conditions.append(col >= lo)
+            if hi is not None:
+                conditions.append(col <= hi)
+        return pl.all_horizontal(conditions)
+
+    def _filtered(self, search, searchable_cols, filters=()):
+        import polars as pl
+
+        terms = _terms(search)
+        key = (tuple(terms), _clauses_key(filters))
+        conditions = [self._filter(clause).fill_null(False) for clause in filters]
+        if terms:
+            cols = [c for c in searchable_cols if c in self.columns]
+            if not cols:
+                return self._frame.filter(pl.lit(False)), key
+            texts = [pl.col(c).cast(pl.Utf8).str.to_lowercase() for c in cols]
+            conditions += [
+                pl.any_horizontal([t.str.contains(term, literal=True).fill_null(False) for t in texts])
+                for term in terms
+            ]
+        if not conditions:
+            return self._frame, ()
+        return self._frame.filter(pl.all_horizontal(conditions)), key
+
+    def _count(self, frame, key):
+        import polars as pl
+
+        with self._lock:
+            count = self._counts.get(key)
+        if count is None:
+            count = frame.select(pl.len()).collect().item()
+            with self._lock:
+                self._counts.put(key, count)
+        return count
+
+    def __len__(self):
+        return self._count(self._frame, ())
+
+    def head(self, n=5):
+        return self._frame.head(n).collect().to_pandas()
+
+    def query(self, search, searchable_cols, order, start, length, filters=()):
+        frame, key = self._filtered(search, searchable_cols, filters)
+        filtered = self._count(frame, key)
+        if order:
+            frame = frame.sort(
+                [o["column"] for o in order],
+                descending=[o.get("dir") == "desc" for o in order],
+                nulls_last=True,
+                maintain_order=True,
+            )
+        frame = frame.slice(start, None if length < 0 else length)
+        return frame.collect().to_pandas(), filtered
+
+
+def as_source(data):
+    """
+    Wrap a Polars frame or a DuckDB relation into a `TableSource`; return
+    anything else unchanged. Detected by type, without importing either
+    package.
+    """
+    cls = type(data)
+    if cls.__module__.split(".")[0] == "polars" and cls.__name__ in ("LazyFrame", "DataFrame"):
+        return PolarsSource(data)
+    if cls.__name__ == "DuckDBPyRelation":
+        return DuckDBSource(relation=data)
+    return data
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from st_datatables._cache import SharedCache
+
+
+def build(value, calls):
+    def run():
+        calls.append(value)
+        return value
+    return run
+
+
+def test_hits_do_not_build():
+    cache = SharedCache(max_bytes=100)
+    calls = []
+    assert cache.get_or_build("a", build(b"1234", calls)) == b"1234"
+    assert cache.get_or_build("a", build(b"other", calls)) == b"1234"
+    assert calls == [b"1234"]
+    assert len(cache) == 1 and cache.nbytes == 4
+
+
+def test_evicts_least_recently_used_beyond_max_bytes():
+    cache = SharedCache(max_bytes=10)
+    calls = []
+    cache.get_or_build("a", build(b"aaaa", calls))
+    cache.get_or_build("b", build(b"bbbb", calls))
+    # Using "a" makes "b" the least recently used entry.
+    cache.get_or_build("a", build(b"", calls))
+    cache.get_or_build("c", build(b"cccc", calls))
+    assert cache.nbytes == 8 <= cache.max_bytes
+    assert len(cache) == 2
+    cache.get_or_build("a", build(b"new a", calls))
+    cache.get_or_build("b", build(b"new b", calls))
+    assert calls == [b"aaaa", b"bbbb", b"cccc", b"new b"]
+
+
+def test_oversize_values_are_not_cached():
+    cache = SharedCache(max_bytes=10)
+    calls = []
+    cache.get_or_build("small", build(b"1234", calls))
+    assert cache.get_or_build("big", build(b"x" * 11, calls)) == b"x" * 11
+    assert "big" not in cache._entries
+    # Nothing was evicted to make room for it.
+    assert len(cache) == 1 and cache.nbytes == 4
+    cache.get_or_build("big", build(b"x" * 11, calls))
+    assert calls == [b"1234", b"x" * 11, b"x" * 11]
+
+
+def test_custom_size():
+    cache = SharedCache(max_bytes=10)
+    cache.get_or_build("a", lambda: ("header", b"12345678"), size=lambda v: len(v[1]))
+    assert cache.nbytes == 8
+
+
+def test_failed_builds_are_not_cached():
+    cache = SharedCache()
+
+    def fail():
+        raise RuntimeError("no")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build("a", fail)
+    assert cache.get_or_build("a", lambda: b"ok") == b"ok"
+
+
+def test_concurrent_misses_build_once():
+    cache = SharedCache()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return b"value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_build("a", slow)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b"value"] * 4
+    assert calls == [1]
+
+
+def test_clear():
+    cache = SharedCache()
+    cache.get_or_build("a", lambda: b"1234")
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables import _delta
+from st_datatables._delta import compute_delta, row_hashes
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "ID": np.arange(10),
+        "NAME": [f"row {i}" for i in range(10)],
+        "SCORE": np.linspace(0, 1, 10),
+    })
+
+
+def delta(old, new, **kwargs):
+    return compute_delta(row_hashes(old, "ID"), row_hashes(new, "ID"), new, "ID", **kwargs)
+
+
+def test_unchanged(df):
+    assert delta(df, df.copy()) == {"add": [], "update": [], "remove": []}
+
+
+def test_add_update_remove(df):
+    new = df.drop(index=[2, 5])
+    new.loc[7, "NAME"] = "seven"
+    new = pd.concat([new, pd.DataFrame({"ID": [10], "NAME": ["ten"], "SCORE": [2.0]})])
+    assert delta(df, new) == {
+        "add": [{"ID": 10, "NAME": "ten", "SCORE": 2.0}],
+        "update": [{"ID": 7, "NAME": "seven", "SCORE": df.loc[7, "SCORE"]}],
+        "remove": [2, 5],
+    }
+
+
+def test_reordered_rows_are_unchanged(df):
+    assert delta(df, df.iloc[::-1]) == {"add": [], "update": [], "remove": []}
+
+
+def test_prepare_and_encode_only_see_sent_rows(df):
+    new = df.copy()
+    new.loc[3, "SCORE"] = 9.0
+    seen = []
+
+    def prepare(frame):
+        seen.append(frame["ID"].tolist())
+        return frame.assign(EXTRA=1)
+
+    result = delta(df, new, prepare=prepare, encode=lambda frame: frame.to_dict("records"))
+    assert seen == [[], [3]]
+    assert result["update"] == [{"ID": 3, "NAME": "row 3", "SCORE": 9.0, "EXTRA": 1}]
+
+
+def test_large_changes_fall_back_to_full_send(df, monkeypatch):
+    new = df.copy()
+    new.loc[:4, "SCORE"] = -1.0
+    # Five of ten rows changed: at the limit a delta is still sent.
+    assert len(delta(df, new)["update"]) == 5
+    new.loc[5, "SCORE"] = -1.0
+    assert delta(df, new) is None
+    monkeypatch.setattr(_delta, "MAX_DELTA_FRACTION", 0.1)
+    assert delta(df, df.drop(index=[0, 1])) is None
+
+
+def test_non_unique_ids_have_no_delta(df):
+    duplicated = df.assign(ID=[0, 0] + list(range(2, 10)))
+    assert row_hashes(duplicated, "ID") is None
+    assert row_hashes(df, "MISSING") is None
+    assert delta(df, duplicated) is None
+    assert delta(duplicated, df) is None
+
+
+def test_unhashable_cells(df):
+    old = df.assign(TAGS=[["a"]] * 10)
+    new = old.copy()
+    new["TAGS"] = [["a"]] * 9 + [["b"]]
+    result = delta(old, new)
+    assert [r["ID"] for r in result["update"]] == [9]
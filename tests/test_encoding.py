@@ -0,0 +1,165 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables._encoding import (
+    as_categories,
+    categorical_columns,
+    dictionaries,
+    encode_columnar,
+    json_column,
+    to_records,
+)
+
+
+def test_categories_sort_text_ignoring_case():
+    df = pd.DataFrame({"FRUIT": ["banana", "Apple", "cherry", "apple", "Banana"]})
+    out = as_categories(df, ["FRUIT"])
+    assert list(out["FRUIT"].cat.categories) == ["Apple", "apple", "Banana", "banana", "cherry"]
+    # The browser sorts on the codes: they follow DataTables' string order.
+    order = out["FRUIT"].cat.codes.sort_values(kind="mergesort").index
+    assert df["FRUIT"][order].str.lower().tolist() == sorted(df["FRUIT"].str.lower())
+
+
+def test_unordered_categoricals_are_reordered():
+    df = pd.DataFrame({"C": pd.Categorical(["b", "A", "a"], categories=["b", "a", "A"])})
+    assert list(as_categories(df, ["C"])["C"].cat.categories) == ["a", "A", "b"]
+
+
+def test_ordered_categoricals_keep_their_order():
+    df = pd.DataFrame({"C": pd.Categorical(["low", "high"], categories=["low", "high"], ordered=True)})
+    assert list(as_categories(df, ["C"])["C"].cat.categories) == ["low", "high"]
+
+
+def test_numeric_categories_sort_as_numbers():
+    df = pd.DataFrame({"N": [10, 9, 1, 10]})
+    assert list(as_categories(df, ["N"])["N"].cat.categories) == [1, 9, 10]
+
+
+def test_auto_categorical_columns():
+    df = pd.DataFrame({
+        "ID": np.arange(100),
+        "GROUP": ["a", "b"] * 50,
+        "NAME": [f"n{i}" for i in range(100)],
+        "KIND": pd.Categorical(["x"] * 100),
+    })
+    assert categorical_columns(df) == ["KIND"]
+    assert categorical_columns(df, "auto") == ["KIND", "GROUP"]
+    assert categorical_columns(df, ["NAME", "MISSING"]) == ["KIND", "NAME"]
+
+
+@pytest.fixture
+def categorical():
+    df = pd.DataFrame({"C": ["b", None, "a", "b"]})
+    return as_categories(df, ["C"])
+
+
+def test_dictionaries(categorical):
+    assert dictionaries(categorical) == {"C": ["a", "b"]}
+    assert dictionaries(pd.DataFrame({"X": [1]})) == {}
+
+
+def test_records_with_and_without_codes(categorical):
+    assert [r["C"] for r in to_records(categorical)] == ["b", None, "a", "b"]
+    assert [r["C"] for r in to_records(categorical, codes=["C"])] == [1, None, 0, 1]
+
+
+def test_columnar_with_and_without_codes(categorical):
+    header, buffer = encode_columnar(categorical)
+    assert header["columns"][0]["values"] == ["b", None, "a", "b"]
+    header, buffer = encode_columnar(categorical, codes=["C"])
+    spec = header["columns"][0]
+    assert spec["kind"] == "category" and spec["dtype"] == "int32"
+    codes = np.frombuffer(buffer, "<i4", spec["length"], spec["offset"])
+    assert codes.tolist() == [1, -1, 0, 1]
+
+
+@pytest.fixture
+def mixed():
+    return pd.DataFrame({
+        "INT": [1, 2, 3],
+        "FLOAT": [1.5, np.nan, np.inf],
+        "NULLABLE": pd.array([1, pd.NA, 3], dtype="Int64"),
+        "BOOL": pd.array([True, pd.NA, False], dtype="boolean"),
+        "TEXT": ["a", None, np.nan],
+        "WHEN": pd.to_datetime(["2024-01-02 03:04:05", None, "2024-12-31 00:00:00"]),
+        "TZ": pd.to_datetime(["2024-01-02 03:04:05", "2024-06-01 00:00:00", None]).tz_localize("Europe/Paris"),
+    })
+
+
+def test_json_column_missing_values(mixed):
+    assert json_column(mixed["FLOAT"]) == [1.5, None, None]
+    assert json_column(mixed["NULLABLE"]) == [1, None, 3]
+    assert json_column(mixed["BOOL"]) == [True, None, False]
+    assert json_column(mixed["TEXT"]) == ["a", None, None]
+    assert json_column(mixed["WHEN"]) == ["2024-01-02T03:04:05", None, "2024-12-31T00:00:00"]
+
+
+def test_json_column_keeps_wall_time(mixed):
+    assert json_column(mixed["TZ"]) == ["2024-01-02T03:04:05", "2024-06-01T00:00:00", None]
+    epoch = json_column(mixed["TZ"], datetimes="epoch")
+    assert epoch[0] == pd.Timestamp("2024-01-02 03:04:05").value // 1_000_000
+    assert epoch[2] is None
+
+
+def test_json_column_python_types():
+    values = json_column(pd.Series([1, 2.5, "x", None], dtype=object))
+    assert values == [1, 2.5, "x", None]
+    assert [type(v) for v in json_column(pd.Series(np.arange(2, dtype="int16")))] == [int, int]
+
+
+def test_records_are_json_safe(mixed):
+    records = to_records(mixed)
+    assert list(records[0]) == list(mixed.columns)
+    assert records[1] == {
+        "INT": 2, "FLOAT": None, "NULLABLE": None, "BOOL": None,
+        "TEXT": None, "WHEN": None, "TZ": "2024-06-01T00:00:00",
+    }
+    json.dumps(records, allow_nan=False)
+    assert to_records(mixed.iloc[:0]) == []
+
+
+def _column(header, buffer, name):
+    spec = next(c for c in header["columns"] if c["name"] == name)
+    if "values" in spec:
+        return spec, spec["values"]
+    dtype = {"int32": "<i4", "float64": "<f8", "uint8": "<u1"}[spec["dtype"]]
+    return spec, np.frombuffer(buffer, dtype, spec["length"], spec["offset"])
+
+
+def test_columnar_typed_arrays(mixed):
+    header, buffer = encode_columnar(mixed)
+    assert header["format"] == "columnar" and header["rows"] == 3
+
+    spec, values = _column(header, buffer, "INT")
+    assert spec["dtype"] == "int32" and values.tolist() == [1, 2, 3]
+    spec, values = _column(header, buffer, "FLOAT")
+    assert spec["dtype"] == "float64" and np.isnan(values[1]) and values[2] == np.inf
+    spec, values = _column(header, buffer, "NULLABLE")
+    assert spec["dtype"] == "float64" and values[0] == 1 and np.isnan(values[1])
+    spec, values = _column(header, buffer, "BOOL")
+    assert spec["dtype"] == "uint8" and values.tolist() == [1, 2, 0]
+    spec, values = _column(header, buffer, "TEXT")
+    assert spec["kind"] == "string" and values == ["a", None, None]
+    spec, values = _column(header, buffer, "TZ")
+    assert values[0] == pd.Timestamp("2024-01-02 03:04:05").value // 1_000_000
+    assert np.isnan(values[2])
+    # Every array starts 8-byte aligned.
+    assert all(c.get("offset", 0) % 8 == 0 for c in header["columns"])
+
+
+def test_columnar_int32_overflow_falls_back_to_float64():
+    big = 2 ** 31
+    header, buffer = encode_columnar(pd.DataFrame({"BIG": [0, big], "SMALL": [0, big - 1]}))
+    spec, values = _column(header, buffer, "BIG")
+    assert spec["dtype"] == "float64" and values.tolist() == [0.0, float(big)]
+    spec, values = _column(header, buffer, "SMALL")
+    assert spec["dtype"] == "int32" and values.tolist() == [0, big - 1]
+
+
+def test_columnar_empty_frame():
+    header, buffer = encode_columnar(pd.DataFrame({"INT": pd.Series([], dtype="int64")}))
+    assert header["rows"] == 0 and header["columns"][0]["length"] == 0
+    assert buffer == b""
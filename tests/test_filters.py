@@ -0,0 +1,123 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables import _filters
+from st_datatables._filters import ColumnFilters, clause_mask
+
+CLAUSES = [
+    {"column": "SCORE", "min": 2, "max": 8},
+    {"column": "GROUP", "values": ["a"]},
+]
+COLUMNS = ["SCORE", "GROUP"]
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "SCORE": np.arange(10, dtype=float),
+        "GROUP": list("abababcabc"),
+        "NAME": [f"row {i}" for i in range(10)],
+    })
+
+
+@pytest.fixture
+def computed(monkeypatch):
+    """Columns of the clause masks computed (not read from the cache)."""
+    columns = []
+
+    def counting(series, clause):
+        columns.append(clause["column"])
+        return clause_mask(series, clause)
+
+    monkeypatch.setattr(_filters, "clause_mask", counting)
+    return columns
+
+
+def expected_mask(df):
+    return (df["SCORE"].between(2, 8) & (df["GROUP"] == "a")).to_numpy().tolist()
+
+
+def test_mask_combines_clauses(df):
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    assert filters.mask(df, CLAUSES).tolist() == expected_mask(df)
+    assert filters.mask(df, []) is None
+
+
+def test_rebuilt_frame_hits_the_cache(df, computed):
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    filters.mask(df, CLAUSES)
+    assert computed == ["SCORE", "GROUP"]
+    # A new but equal DataFrame, as a script building it on every rerun.
+    rebuilt = df.copy()
+    filters.update(rebuilt, COLUMNS)
+    assert filters.mask(rebuilt, CLAUSES).tolist() == expected_mask(df)
+    assert computed == ["SCORE", "GROUP"]
+
+
+def test_refined_filter_keeps_the_other_masks(df, computed):
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    filters.mask(df, CLAUSES)
+    filters.update(df, COLUMNS)
+    filters.mask(df, [CLAUSES[0], {"column": "GROUP", "values": ["a", "b"]}])
+    assert computed == ["SCORE", "GROUP", "GROUP"]
+
+
+def test_changed_column_recomputes_its_masks(df, computed):
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    filters.mask(df, CLAUSES)
+    df.loc[3, "SCORE"] = 100
+    filters.update(df, COLUMNS)
+    assert filters.mask(df, CLAUSES).tolist() == expected_mask(df)
+    assert computed == ["SCORE", "GROUP", "SCORE"]
+
+
+def test_specs_follow_the_content(df):
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    specs = filters.specs(df, COLUMNS)
+    rebuilt = df.copy()
+    filters.update(rebuilt, COLUMNS)
+    assert filters.specs(rebuilt, COLUMNS) == specs
+    df.loc[0, "SCORE"] = 109
+    filters.update(df, COLUMNS)
+    assert filters.specs(df, COLUMNS)[0]["max"] == 109
+
+
+def _fastest(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_cache_hit_is_cheaper_than_computing():
+    rng = np.random.default_rng(0)
+    rows = 500_000
+    df = pd.DataFrame({
+        "SCORE": rng.random(rows) * 100,
+        "GROUP": np.array(list("abcdefgh"), dtype=object)[rng.integers(0, 8, rows)],
+    })
+    filters = ColumnFilters()
+    filters.update(df, COLUMNS)
+    filters.mask(df, CLAUSES)
+
+    def hit():
+        # What every rerun does, with a new but equal DataFrame.
+        rebuilt = df.copy()
+        filters.update(rebuilt, COLUMNS)
+        filters.mask(rebuilt, CLAUSES)
+
+    def compute():
+        rebuilt = df.copy()
+        np.logical_and.reduce([clause_mask(rebuilt[c["column"]], c) for c in CLAUSES])
+
+    assert _fastest(hit) < _fastest(compute)
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables._presort import column_ranks
+
+
+@pytest.mark.parametrize(
+    "series, expected",
+    [
+        (pd.Series([3, 1, np.nan, 1, 2]), [3, 0, 4, 0, 2]),
+        (pd.Series(["b", "A", None, "a"]), [2, 0, 3, 0]),
+        (pd.Series([True, pd.NA, False, True, pd.NA], dtype="boolean"), [1, 3, 0, 1, 3]),
+        (pd.Series([1, 2, pd.NA], dtype="Int64"), [0, 1, 2]),
+        (pd.Series([pd.NA, pd.NA], dtype="boolean"), [0, 0]),
+        (pd.Series([np.nan] * 3), [0, 0, 0]),
+        (pd.Series([np.nan, 1.0, np.nan]), [1, 0, 1]),
+        (pd.Series([], dtype=float), []),
+    ],
+)
+def test_column_ranks(series, expected):
+    assert column_ranks(series).tolist() == expected
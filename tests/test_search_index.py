@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables._search_index import SearchIndex
+from st_datatables._serverside import process_request, search_mask
+
+SEARCHES = [
+    "", "a", "ab", "ben", "benz", "BENZENE", "ene ol", "non", "nan", "none",
+    "é", "café", "12", "1 2", "xyz", "c1ccccc1", "zz top",
+]
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    words = ["benzene", "ethanol", "Café", "phenol", None, "c1ccccc1", "ab", np.nan]
+    return pd.DataFrame({
+        "ID": np.arange(200),
+        "NAME": [words[i] for i in rng.integers(0, len(words), 200)],
+        "NUM_ATOMS": rng.integers(0, 100, 200),
+    })
+
+
+def assert_same(df, index, search, cols):
+    expected = search_mask(df, search, cols)
+    got = index.mask(df, search)
+    if expected is None:
+        assert got is None
+        return
+    assert got.to_numpy(dtype=bool).tolist() == expected.to_numpy(dtype=bool).tolist()
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_index_matches_scan(df, search):
+    cols = ["NAME", "NUM_ATOMS"]
+    assert_same(df, SearchIndex(df, cols, "ID"), search, cols)
+
+
+def test_missing_values_match_nothing(df):
+    index = SearchIndex(df, ["NAME"], "ID")
+    for search in ["none", "nan", "<na>"]:
+        assert not index.mask(df, search).any()
+
+
+@pytest.mark.parametrize("search", ["1", "12", "99", "1 2"])
+def test_cells_shorter_than_a_trigram(df, search):
+    index = SearchIndex(df, ["NUM_ATOMS"], "ID")
+    assert_same(df, index, search, ["NUM_ATOMS"])
+
+
+def test_empty_frame():
+    empty = pd.DataFrame({"ID": [], "NAME": []})
+    index = SearchIndex(empty, ["NAME"], "ID")
+    assert not index.mask(empty, "abc").any()
+
+
+@pytest.mark.parametrize("changed_rows", [5, 60], ids=["overlay", "rebuild"])
+def test_incremental_update(df, changed_rows):
+    cols = ["NAME", "NUM_ATOMS"]
+    index = SearchIndex(df, cols, "ID")
+    new = df.copy()
+    new.loc[new.index[:changed_rows], "NAME"] = "toluene"
+    new = new.drop(new.index[-3:])
+    added = pd.DataFrame({"ID": [1000, 1001], "NAME": ["xylene", None], "NUM_ATOMS": [7, 8]})
+    new = pd.concat([new, added], ignore_index=True)
+    index.update(new)
+    for search in SEARCHES + ["tolu", "xylene", "ene"]:
+        assert_same(new, index, search, cols)
+
+
+def test_update_after_in_place_changes(df):
+    cols = ["NAME", "NUM_ATOMS"]
+    index = SearchIndex(df, cols, "ID")
+    df.loc[7, "NAME"] = "benzyl"
+    index.update(df)
+    assert_same(df, index, "benzyl", cols)
+    df.drop(index=range(6), inplace=True)
+    index.update(df)
+    for search in SEARCHES + ["benzyl"]:
+        assert_same(df, index, search, cols)
+
+
+def test_update_of_an_equal_frame_keeps_the_index(df):
+    index = SearchIndex(df, ["NAME"], "ID")
+    grams = index._grams
+    index.update(df.copy())
+    assert index._grams is grams
+    assert_same(df, index, "ben", ["NAME"])
+
+
+def test_update_without_unique_ids(df):
+    cols = ["NAME"]
+    df = df.assign(ID=0)
+    index = SearchIndex(df, cols, "ID")
+    new = df.copy()
+    new.loc[new.index[:3], "NAME"] = "toluene"
+    index.update(new)
+    assert_same(new, index, "tolu", cols)
+
+
+def test_server_side_search_with_missing_values(df):
+    cols = ["NAME", "NUM_ATOMS"]
+    request = {"draw": 1, "start": 0, "length": 10, "order": [], "search": "ben"}
+    plain = process_request(df, request, cols, cols)
+    indexed = process_request(df, request, cols, cols, index=SearchIndex(df, cols, "ID"))
+    assert indexed["recordsFiltered"] == plain["recordsFiltered"] > 0
+    assert indexed["data"] == plain["data"]
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from st_datatables._serverside import process_request
+from st_datatables.sources import ArrowSource, DuckDBSource, PolarsSource, SQLiteSource
+
+SEARCHABLE = ["ID", "NAME", "GROUP"]
+ORDERABLE = ["ID", "NAME", "GROUP", "SCORE", "DAY"]
+FILTERABLE = ["NAME", "GROUP", "SCORE", "DAY"]
+
+# The id breaks ties, as SQL engines do not order them stably.
+REQUESTS = {
+    "all": {"start": 0, "length": -1},
+    "page": {"start": 0, "length": 10, "order": [{"column": "ID", "dir": "asc"}]},
+    "offset": {"start": 25, "length": 10, "order": [{"column": "ID", "dir": "desc"}]},
+    "offset-all": {"start": 90, "length": -1, "order": [{"column": "ID", "dir": "asc"}]},
+    "past-end": {"start": 500, "length": 10, "order": [{"column": "ID", "dir": "asc"}]},
+    "search": {"start": 0, "length": -1, "search": "ben", "order": [{"column": "ID", "dir": "asc"}]},
+    "search-terms": {
+        "start": 2, "length": 5, "search": "OL b",
+        "order": [{"column": "ID", "dir": "asc"}],
+    },
+    "search-number": {"start": 0, "length": -1, "search": "17", "order": [{"column": "ID", "dir": "asc"}]},
+    "search-none": {"start": 0, "length": 10, "search": "xyz"},
+    "order-missing": {
+        "start": 0, "length": -1,
+        "order": [{"column": "SCORE", "dir": "desc"}, {"column": "ID", "dir": "asc"}],
+    },
+    "order-text": {
+        "start": 5, "length": 20,
+        "order": [{"column": "NAME", "dir": "asc"}, {"column": "ID", "dir": "desc"}],
+    },
+    "values": {
+        "start": 0, "length": -1, "order": [{"column": "ID", "dir": "asc"}],
+        "filters": [{"column": "GROUP", "values": ["a", "c"]}],
+    },
+    "range": {
+        "start": 3, "length": 10, "order": [{"column": "ID", "dir": "asc"}],
+        "filters": [{"column": "SCORE", "min": 20, "max": 60}],
+    },
+    "dates": {
+        "start": 0, "length": -1, "order": [{"column": "ID", "dir": "asc"}],
+        "filters": [{"column": "DAY", "min": "2024-01-10", "max": "2024-01-20"}],
+    },
+    "text-filter-search": {
+        "start": 0, "length": -1, "search": "b",
+        "order": [{"column": "ID", "dir": "asc"}],
+        "filters": [{"column": "NAME", "text": "EN"}, {"column": "GROUP", "values": ["b"]}],
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def df():
+    rng = np.random.default_rng(0)
+    rows = 120
+    words = ["benzene", "ethanol", "phenol", "cafe", None, "ab"]
+    score = rng.integers(0, 100, rows).astype(float)
+    score[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        "ID": np.arange(rows),
+        "NAME": [words[i] for i in rng.integers(0, len(words), rows)],
+        "GROUP": [["a", "b", "c"][i] for i in rng.integers(0, 3, rows)],
+        "SCORE": score,
+        "DAY": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, rows), unit="D"),
+    })
+
+
+def _sqlite(df, tmp_path):
+    import sqlite3
+
+    path = tmp_path / "table.db"
+    with sqlite3.connect(path) as connection:
+        df.to_sql("rows", connection, index=False)
+    return SQLiteSource(path, table="rows")
+
+
+def _sqlite_query(df, tmp_path):
+    source = _sqlite(df, tmp_path)
+    return SQLiteSource(source.path, query="SELECT * FROM rows")
+
+
+def _parquet(df, tmp_path):
+    path = tmp_path / "table.parquet"
+    df.to_parquet(path, row_group_size=32)
+    return ArrowSource(path)
+
+
+def _feather(df, tmp_path):
+    path = tmp_path / "table.feather"
+    df.to_feather(path)
+    return ArrowSource(path)
+
+
+def _polars(df, tmp_path):
+    pl = pytest.importorskip("polars")
+    return PolarsSource(pl.from_pandas(df).lazy())
+
+
+def _duckdb_relation(df, tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    path = tmp_path / "table.parquet"
+    df.to_parquet(path)
+    return DuckDBSource(relation=duckdb.read_parquet(str(path)))
+
+
+SOURCES = {
+    "sqlite": _sqlite,
+    "sqlite-query": _sqlite_query,
+    "parquet": _parquet,
+    "feather": _feather,
+    "polars": _polars,
+    "duckdb-relation": _duckdb_relation,
+}
+
+
+@pytest.fixture(scope="module", params=list(SOURCES))
+def source(request, df, tmp_path_factory):
+    return SOURCES[request.param](df, tmp_path_factory.mktemp(request.param))
+
+
+@pytest.mark.parametrize("name", list(REQUESTS))
+def test_source_matches_dataframe(df, source, name):
+    request = REQUESTS[name]
+    expected = process_request(df, request, SEARCHABLE, ORDERABLE, filter_cols=FILTERABLE)
+    got = process_request(source, request, SEARCHABLE, ORDERABLE, filter_cols=FILTERABLE)
+    assert got["recordsTotal"] == expected["recordsTotal"]
+    assert got["recordsFiltered"] == expected["recordsFiltered"]
+    assert [r["ID"] for r in got["data"]] == [r["ID"] for r in expected["data"]]
+
+
+def test_requests_are_not_trivial(df):
+    # Guard the cases above against matching everything or nothing.
+    for name in ("search", "search-terms", "values", "range", "dates", "text-filter-search"):
+        response = process_request(df, REQUESTS[name], SEARCHABLE, ORDERABLE, filter_cols=FILTERABLE)
+        assert 0 < response["recordsFiltered"] < len(df), name